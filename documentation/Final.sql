@@ -160,6 +160,675 @@ CREATE TABLE IF NOT EXISTS Home_IMS.History (
   CHECK (quantity > 0)
 );
 
+CREATE TABLE IF NOT EXISTS Home_IMS.SchemaVersion (
+  version INT NOT NULL,
+  applied DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (version)
+);
+
+
+
+
+-----------------------------------------------------------------------------------------
+--- ------------------------------ Database Migrations ------------------------------ ---
+-----------------------------------------------------------------------------------------
+
+-- Version 1: Index History by outcome, time and user --
+ALTER TABLE Home_IMS.History
+ADD INDEX History_wasted_timestamp (wasted, timestamp),
+ADD INDEX History_user_name_timestamp (user_name, timestamp);
+
+-- Version 1: Index Purchase by time, store and buyer --
+ALTER TABLE Home_IMS.Purchase
+ADD INDEX Purchase_timestamp (timestamp),
+ADD INDEX Purchase_store_timestamp (store, timestamp),
+ADD INDEX Purchase_parent_name_timestamp (parent_name, timestamp);
+
+-- Version 1: Index Inventory by expiry and storage --
+ALTER TABLE Home_IMS.Inventory
+ADD INDEX Inventory_expiry (expiry),
+ADD INDEX Inventory_storage_name_expiry (storage_name, expiry);
+
+-- Version 1: Index MealSchedule by time --
+ALTER TABLE Home_IMS.MealSchedule
+ADD INDEX MealSchedule_timestamp_recipe_name (timestamp, recipe_name);
+
+-- Version 1: Index Ingredients by recipe --
+ALTER TABLE Home_IMS.Ingredients
+ADD INDEX Ingredients_recipe_name_quantity (recipe_name, quantity);
+
+-- Version 2: Clear any partially applied surrogate key migration --
+BEGIN NOT ATOMIC
+IF (SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = 'Home_IMS' AND TABLE_NAME IN ('ItemType_old', 'Consumable_old', 'Durable_old', 'NotFood_old', 'Food_old', 'Template_old', 'OtherTemplate_old', 'Recipe_old', 'MealSchedule_old', 'User_old', 'Dependent_old', 'Parent_old', 'Ingredients_old', 'Storage_old', 'Dry_old', 'Appliance_old', 'Fridge_old', 'Freezer_old', 'Inventory_old', 'Purchase_old', 'History_old')) = 21 THEN
+RENAME TABLE Home_IMS.ItemType TO Home_IMS.ItemType_v2, Home_IMS.ItemType_old TO Home_IMS.ItemType, Home_IMS.Consumable TO Home_IMS.Consumable_v2, Home_IMS.Consumable_old TO Home_IMS.Consumable, Home_IMS.Durable TO Home_IMS.Durable_v2, Home_IMS.Durable_old TO Home_IMS.Durable, Home_IMS.NotFood TO Home_IMS.NotFood_v2, Home_IMS.NotFood_old TO Home_IMS.NotFood, Home_IMS.Food TO Home_IMS.Food_v2, Home_IMS.Food_old TO Home_IMS.Food, Home_IMS.Template TO Home_IMS.Template_v2, Home_IMS.Template_old TO Home_IMS.Template, Home_IMS.OtherTemplate TO Home_IMS.OtherTemplate_v2, Home_IMS.OtherTemplate_old TO Home_IMS.OtherTemplate, Home_IMS.Recipe TO Home_IMS.Recipe_v2, Home_IMS.Recipe_old TO Home_IMS.Recipe, Home_IMS.MealSchedule TO Home_IMS.MealSchedule_v2, Home_IMS.MealSchedule_old TO Home_IMS.MealSchedule, Home_IMS.User TO Home_IMS.User_v2, Home_IMS.User_old TO Home_IMS.User, Home_IMS.Dependent TO Home_IMS.Dependent_v2, Home_IMS.Dependent_old TO Home_IMS.Dependent, Home_IMS.Parent TO Home_IMS.Parent_v2, Home_IMS.Parent_old TO Home_IMS.Parent, Home_IMS.Ingredients TO Home_IMS.Ingredients_v2, Home_IMS.Ingredients_old TO Home_IMS.Ingredients, Home_IMS.Storage TO Home_IMS.Storage_v2, Home_IMS.Storage_old TO Home_IMS.Storage, Home_IMS.Dry TO Home_IMS.Dry_v2, Home_IMS.Dry_old TO Home_IMS.Dry, Home_IMS.Appliance TO Home_IMS.Appliance_v2, Home_IMS.Appliance_old TO Home_IMS.Appliance, Home_IMS.Fridge TO Home_IMS.Fridge_v2, Home_IMS.Fridge_old TO Home_IMS.Fridge, Home_IMS.Freezer TO Home_IMS.Freezer_v2, Home_IMS.Freezer_old TO Home_IMS.Freezer, Home_IMS.Inventory TO Home_IMS.Inventory_v2, Home_IMS.Inventory_old TO Home_IMS.Inventory, Home_IMS.Purchase TO Home_IMS.Purchase_v2, Home_IMS.Purchase_old TO Home_IMS.Purchase, Home_IMS.History TO Home_IMS.History_v2, Home_IMS.History_old TO Home_IMS.History;
+END IF;
+IF (SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = 'Home_IMS' AND TABLE_NAME IN ('ItemType', 'Consumable', 'Durable', 'NotFood', 'Food', 'Template', 'OtherTemplate', 'Recipe', 'MealSchedule', 'User', 'Dependent', 'Parent', 'Ingredients', 'Storage', 'Dry', 'Appliance', 'Fridge', 'Freezer', 'Inventory', 'Purchase', 'History')) = 21 THEN
+DROP TABLE IF EXISTS Home_IMS.History_v2, Home_IMS.Purchase_v2, Home_IMS.Inventory_v2, Home_IMS.Freezer_v2, Home_IMS.Fridge_v2, Home_IMS.Appliance_v2, Home_IMS.Dry_v2, Home_IMS.Storage_v2, Home_IMS.Ingredients_v2, Home_IMS.Parent_v2, Home_IMS.Dependent_v2, Home_IMS.User_v2, Home_IMS.MealSchedule_v2, Home_IMS.Recipe_v2, Home_IMS.OtherTemplate_v2, Home_IMS.Template_v2, Home_IMS.Food_v2, Home_IMS.NotFood_v2, Home_IMS.Durable_v2, Home_IMS.Consumable_v2, Home_IMS.ItemType_v2;
+END IF;
+END;
+
+-- Version 2: Create ItemType with a surrogate key --
+CREATE TABLE Home_IMS.ItemType_v2 (
+  id INT NOT NULL AUTO_INCREMENT,
+  name VARCHAR(255) NOT NULL,
+  unit VARCHAR(16),
+  PRIMARY KEY (id),
+  UNIQUE KEY ItemType_name (name)
+);
+
+-- Version 2: Copy ItemType --
+INSERT INTO Home_IMS.ItemType_v2 (name, unit)
+SELECT name, unit
+FROM Home_IMS.ItemType;
+
+-- Version 2: Create Consumable with a surrogate key --
+CREATE TABLE Home_IMS.Consumable_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Consumable_id_fk FOREIGN KEY (id) REFERENCES ItemType_v2 (id)
+);
+
+-- Version 2: Copy Consumable --
+INSERT INTO Home_IMS.Consumable_v2 (id)
+SELECT T.id
+FROM Home_IMS.Consumable AS C
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = C.name;
+
+-- Version 2: Create Durable with a surrogate key --
+CREATE TABLE Home_IMS.Durable_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Durable_id_fk FOREIGN KEY (id) REFERENCES ItemType_v2 (id)
+);
+
+-- Version 2: Copy Durable --
+INSERT INTO Home_IMS.Durable_v2 (id)
+SELECT T.id
+FROM Home_IMS.Durable AS C
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = C.name;
+
+-- Version 2: Create NotFood with a surrogate key --
+CREATE TABLE Home_IMS.NotFood_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT NotFood_id_fk FOREIGN KEY (id) REFERENCES Consumable_v2 (id)
+);
+
+-- Version 2: Copy NotFood --
+INSERT INTO Home_IMS.NotFood_v2 (id)
+SELECT T.id
+FROM Home_IMS.NotFood AS C
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = C.name;
+
+-- Version 2: Create Food with a surrogate key --
+CREATE TABLE Home_IMS.Food_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Food_id_fk FOREIGN KEY (id) REFERENCES Consumable_v2 (id)
+);
+
+-- Version 2: Copy Food --
+INSERT INTO Home_IMS.Food_v2 (id)
+SELECT T.id
+FROM Home_IMS.Food AS C
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = C.name;
+
+-- Version 2: Create Template with a surrogate key --
+CREATE TABLE Home_IMS.Template_v2 (
+  id INT NOT NULL AUTO_INCREMENT,
+  name VARCHAR(255) NOT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY Template_name (name)
+);
+
+-- Version 2: Copy Template --
+INSERT INTO Home_IMS.Template_v2 (name)
+SELECT name
+FROM Home_IMS.Template;
+
+-- Version 2: Create OtherTemplate with a surrogate key --
+CREATE TABLE Home_IMS.OtherTemplate_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT OtherTemplate_id_fk FOREIGN KEY (id) REFERENCES Template_v2 (id) ON DELETE CASCADE
+);
+
+-- Version 2: Copy OtherTemplate --
+INSERT INTO Home_IMS.OtherTemplate_v2 (id)
+SELECT T.id
+FROM Home_IMS.OtherTemplate AS C
+JOIN Home_IMS.Template_v2 AS T ON T.name = C.name;
+
+-- Version 2: Create Recipe with a surrogate key --
+CREATE TABLE Home_IMS.Recipe_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Recipe_id_fk FOREIGN KEY (id) REFERENCES Template_v2 (id) ON DELETE CASCADE
+);
+
+-- Version 2: Copy Recipe --
+INSERT INTO Home_IMS.Recipe_v2 (id)
+SELECT T.id
+FROM Home_IMS.Recipe AS C
+JOIN Home_IMS.Template_v2 AS T ON T.name = C.recipe_name;
+
+-- Version 2: Create MealSchedule with a surrogate key --
+CREATE TABLE Home_IMS.MealSchedule_v2 (
+  recipe_id INT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  meal_type VARCHAR(31),
+  PRIMARY KEY (recipe_id, timestamp),
+  INDEX MealSchedule_timestamp_recipe_id (timestamp, recipe_id),
+  CONSTRAINT MealSchedule_recipe_id_fk FOREIGN KEY (recipe_id) REFERENCES Recipe_v2 (id) ON DELETE CASCADE
+);
+
+-- Version 2: Copy MealSchedule --
+INSERT INTO Home_IMS.MealSchedule_v2 (recipe_id, timestamp, meal_type)
+SELECT T.id, M.timestamp, M.meal_type
+FROM Home_IMS.MealSchedule AS M
+JOIN Home_IMS.Template_v2 AS T ON T.name = M.recipe_name;
+
+-- Version 2: Create User with a surrogate key --
+CREATE TABLE Home_IMS.User_v2 (
+  id INT NOT NULL AUTO_INCREMENT,
+  name VARCHAR(255) NOT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY User_name (name)
+);
+
+-- Version 2: Copy User --
+INSERT INTO Home_IMS.User_v2 (name)
+SELECT name
+FROM Home_IMS.User;
+
+-- Version 2: Create Dependent with a surrogate key --
+CREATE TABLE Home_IMS.Dependent_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Dependent_id_fk FOREIGN KEY (id) REFERENCES User_v2 (id)
+);
+
+-- Version 2: Copy Dependent --
+INSERT INTO Home_IMS.Dependent_v2 (id)
+SELECT U.id
+FROM Home_IMS.Dependent AS C
+JOIN Home_IMS.User_v2 AS U ON U.name = C.name;
+
+-- Version 2: Create Parent with a surrogate key --
+CREATE TABLE Home_IMS.Parent_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Parent_id_fk FOREIGN KEY (id) REFERENCES User_v2 (id)
+);
+
+-- Version 2: Copy Parent --
+INSERT INTO Home_IMS.Parent_v2 (id)
+SELECT U.id
+FROM Home_IMS.Parent AS C
+JOIN Home_IMS.User_v2 AS U ON U.name = C.name;
+
+-- Version 2: Create Ingredients with surrogate keys --
+CREATE TABLE Home_IMS.Ingredients_v2 (
+  recipe_id INT NOT NULL,
+  food_id INT NOT NULL,
+  quantity FLOAT NOT NULL,
+  PRIMARY KEY (recipe_id, food_id),
+  INDEX Ingredients_food_id (food_id),
+  CONSTRAINT Ingredients_food_id_fk FOREIGN KEY (food_id) REFERENCES Food_v2 (id),
+  CONSTRAINT Ingredients_recipe_id_fk FOREIGN KEY (recipe_id) REFERENCES Recipe_v2 (id) ON DELETE CASCADE,
+  CHECK (quantity > 0)
+);
+
+-- Version 2: Copy Ingredients --
+INSERT INTO Home_IMS.Ingredients_v2 (recipe_id, food_id, quantity)
+SELECT R.id, F.id, I.quantity
+FROM Home_IMS.Ingredients AS I
+JOIN Home_IMS.Template_v2 AS R ON R.name = I.recipe_name
+JOIN Home_IMS.ItemType_v2 AS F ON F.name = I.food_name;
+
+-- Version 2: Create Storage with a surrogate key --
+CREATE TABLE Home_IMS.Storage_v2 (
+  id INT NOT NULL AUTO_INCREMENT,
+  storage_name VARCHAR(255) NOT NULL,
+  location_name VARCHAR(255) NOT NULL,
+  capacity FLOAT NOT NULL DEFAULT 0,
+  PRIMARY KEY (id),
+  UNIQUE KEY Storage_storage_name (storage_name),
+  CONSTRAINT Storage_location_name_fk FOREIGN KEY (location_name) REFERENCES Location (name),
+  CHECK (capacity >= 0 AND capacity <= 2)
+);
+
+-- Version 2: Copy Storage --
+INSERT INTO Home_IMS.Storage_v2 (storage_name, location_name, capacity)
+SELECT storage_name, location_name, capacity
+FROM Home_IMS.Storage;
+
+-- Version 2: Create Dry with a surrogate key --
+CREATE TABLE Home_IMS.Dry_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Dry_id_fk FOREIGN KEY (id) REFERENCES Storage_v2 (id)
+);
+
+-- Version 2: Copy Dry --
+INSERT INTO Home_IMS.Dry_v2 (id)
+SELECT S.id
+FROM Home_IMS.Dry AS C
+JOIN Home_IMS.Storage_v2 AS S ON S.storage_name = C.name;
+
+-- Version 2: Create Appliance with a surrogate key --
+CREATE TABLE Home_IMS.Appliance_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Appliance_id_fk FOREIGN KEY (id) REFERENCES Storage_v2 (id)
+);
+
+-- Version 2: Copy Appliance --
+INSERT INTO Home_IMS.Appliance_v2 (id)
+SELECT S.id
+FROM Home_IMS.Appliance AS C
+JOIN Home_IMS.Storage_v2 AS S ON S.storage_name = C.name;
+
+-- Version 2: Create Fridge with a surrogate key --
+CREATE TABLE Home_IMS.Fridge_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Fridge_id_fk FOREIGN KEY (id) REFERENCES Appliance_v2 (id)
+);
+
+-- Version 2: Copy Fridge --
+INSERT INTO Home_IMS.Fridge_v2 (id)
+SELECT S.id
+FROM Home_IMS.Fridge AS C
+JOIN Home_IMS.Storage_v2 AS S ON S.storage_name = C.name;
+
+-- Version 2: Create Freezer with a surrogate key --
+CREATE TABLE Home_IMS.Freezer_v2 (
+  id INT NOT NULL,
+  PRIMARY KEY (id),
+  CONSTRAINT Freezer_id_fk FOREIGN KEY (id) REFERENCES Appliance_v2 (id)
+);
+
+-- Version 2: Copy Freezer --
+INSERT INTO Home_IMS.Freezer_v2 (id)
+SELECT S.id
+FROM Home_IMS.Freezer AS C
+JOIN Home_IMS.Storage_v2 AS S ON S.storage_name = C.name;
+
+-- Version 2: Create Inventory with surrogate keys --
+CREATE TABLE Home_IMS.Inventory_v2 (
+  item_id INT NOT NULL,
+  storage_id INT NOT NULL,
+  timestamp DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  expiry DATETIME,
+  quantity FLOAT NOT NULL,
+  PRIMARY KEY (item_id, storage_id, timestamp),
+  INDEX Inventory_expiry (expiry),
+  INDEX Inventory_storage_id_expiry (storage_id, expiry),
+  CONSTRAINT Inventory_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType_v2 (id),
+  CONSTRAINT Inventory_storage_id_fk FOREIGN KEY (storage_id) REFERENCES Storage_v2 (id),
+  CHECK (quantity >= 0)
+);
+
+-- Version 2: Copy Inventory --
+INSERT INTO Home_IMS.Inventory_v2 (item_id, storage_id, timestamp, expiry, quantity)
+SELECT T.id, S.id, I.timestamp, I.expiry, I.quantity
+FROM Home_IMS.Inventory AS I
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = I.item_name
+JOIN Home_IMS.Storage_v2 AS S ON S.storage_name = I.storage_name;
+
+-- Version 2: Create Purchase with surrogate keys --
+CREATE TABLE Home_IMS.Purchase_v2 (
+  item_id INT NOT NULL,
+  timestamp DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  quantity FLOAT NOT NULL,
+  price FLOAT NOT NULL,
+  store VARCHAR(255) NOT NULL,
+  parent_id INT NOT NULL,
+  PRIMARY KEY (item_id, timestamp),
+  INDEX Purchase_timestamp (timestamp),
+  INDEX Purchase_store_timestamp (store, timestamp),
+  INDEX Purchase_parent_id_timestamp (parent_id, timestamp),
+  CONSTRAINT Purchase_parent_id_fk FOREIGN KEY (parent_id) REFERENCES Parent_v2 (id),
+  CONSTRAINT Purchase_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType_v2 (id),
+  CHECK (quantity > 0)
+);
+
+-- Version 2: Copy Purchase --
+INSERT INTO Home_IMS.Purchase_v2 (item_id, timestamp, quantity, price, store, parent_id)
+SELECT T.id, P.timestamp, P.quantity, P.price, P.store, U.id
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = P.item_name
+JOIN Home_IMS.User_v2 AS U ON U.name = P.parent_name;
+
+-- Version 2: Create History with surrogate keys --
+CREATE TABLE Home_IMS.History_v2 (
+  item_id INT NOT NULL,
+  timestamp DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  quantity FLOAT NOT NULL,
+  wasted BOOLEAN NOT NULL,
+  user_id INT,
+  PRIMARY KEY (item_id, timestamp),
+  INDEX History_wasted_timestamp (wasted, timestamp),
+  INDEX History_user_id_timestamp (user_id, timestamp),
+  CONSTRAINT History_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType_v2 (id),
+  CONSTRAINT History_user_id_fk FOREIGN KEY (user_id) REFERENCES User_v2 (id),
+  CHECK (quantity > 0)
+);
+
+-- Version 2: Copy History --
+INSERT INTO Home_IMS.History_v2 (item_id, timestamp, quantity, wasted, user_id)
+SELECT T.id, H.timestamp, H.quantity, H.wasted, U.id
+FROM Home_IMS.History AS H
+JOIN Home_IMS.ItemType_v2 AS T ON T.name = H.item_name
+     LEFT JOIN Home_IMS.User_v2 AS U ON U.name = H.user_name;
+
+-- Version 2: Replace the name keyed tables --
+RENAME TABLE Home_IMS.ItemType TO Home_IMS.ItemType_old, Home_IMS.ItemType_v2 TO Home_IMS.ItemType, Home_IMS.Consumable TO Home_IMS.Consumable_old, Home_IMS.Consumable_v2 TO Home_IMS.Consumable, Home_IMS.Durable TO Home_IMS.Durable_old, Home_IMS.Durable_v2 TO Home_IMS.Durable, Home_IMS.NotFood TO Home_IMS.NotFood_old, Home_IMS.NotFood_v2 TO Home_IMS.NotFood, Home_IMS.Food TO Home_IMS.Food_old, Home_IMS.Food_v2 TO Home_IMS.Food, Home_IMS.Template TO Home_IMS.Template_old, Home_IMS.Template_v2 TO Home_IMS.Template, Home_IMS.OtherTemplate TO Home_IMS.OtherTemplate_old, Home_IMS.OtherTemplate_v2 TO Home_IMS.OtherTemplate, Home_IMS.Recipe TO Home_IMS.Recipe_old, Home_IMS.Recipe_v2 TO Home_IMS.Recipe, Home_IMS.MealSchedule TO Home_IMS.MealSchedule_old, Home_IMS.MealSchedule_v2 TO Home_IMS.MealSchedule, Home_IMS.User TO Home_IMS.User_old, Home_IMS.User_v2 TO Home_IMS.User, Home_IMS.Dependent TO Home_IMS.Dependent_old, Home_IMS.Dependent_v2 TO Home_IMS.Dependent, Home_IMS.Parent TO Home_IMS.Parent_old, Home_IMS.Parent_v2 TO Home_IMS.Parent, Home_IMS.Ingredients TO Home_IMS.Ingredients_old, Home_IMS.Ingredients_v2 TO Home_IMS.Ingredients, Home_IMS.Storage TO Home_IMS.Storage_old, Home_IMS.Storage_v2 TO Home_IMS.Storage, Home_IMS.Dry TO Home_IMS.Dry_old, Home_IMS.Dry_v2 TO Home_IMS.Dry, Home_IMS.Appliance TO Home_IMS.Appliance_old, Home_IMS.Appliance_v2 TO Home_IMS.Appliance, Home_IMS.Fridge TO Home_IMS.Fridge_old, Home_IMS.Fridge_v2 TO Home_IMS.Fridge, Home_IMS.Freezer TO Home_IMS.Freezer_old, Home_IMS.Freezer_v2 TO Home_IMS.Freezer, Home_IMS.Inventory TO Home_IMS.Inventory_old, Home_IMS.Inventory_v2 TO Home_IMS.Inventory, Home_IMS.Purchase TO Home_IMS.Purchase_old, Home_IMS.Purchase_v2 TO Home_IMS.Purchase, Home_IMS.History TO Home_IMS.History_old, Home_IMS.History_v2 TO Home_IMS.History;
+
+-- Version 3: Drop the name keyed tables --
+DROP TABLE IF EXISTS Home_IMS.History_old, Home_IMS.Purchase_old, Home_IMS.Inventory_old, Home_IMS.Freezer_old, Home_IMS.Fridge_old, Home_IMS.Appliance_old, Home_IMS.Dry_old, Home_IMS.Storage_old, Home_IMS.Ingredients_old, Home_IMS.Parent_old, Home_IMS.Dependent_old, Home_IMS.User_old, Home_IMS.MealSchedule_old, Home_IMS.Recipe_old, Home_IMS.OtherTemplate_old, Home_IMS.Template_old, Home_IMS.Food_old, Home_IMS.NotFood_old, Home_IMS.Durable_old, Home_IMS.Consumable_old, Home_IMS.ItemType_old;
+
+-- Version 3: Index History by item and time --
+ALTER TABLE Home_IMS.History
+ADD INDEX History_item_id_timestamp (item_id, timestamp);
+
+-- Version 3: Cluster History by insertion order --
+ALTER TABLE Home_IMS.History
+DROP PRIMARY KEY,
+ADD COLUMN id BIGINT NOT NULL AUTO_INCREMENT FIRST,
+ADD PRIMARY KEY (id);
+
+-- Version 3: Index Purchase by item and time --
+ALTER TABLE Home_IMS.Purchase
+ADD INDEX Purchase_item_id_timestamp (item_id, timestamp);
+
+-- Version 3: Cluster Purchase by insertion order --
+ALTER TABLE Home_IMS.Purchase
+DROP PRIMARY KEY,
+ADD COLUMN id BIGINT NOT NULL AUTO_INCREMENT FIRST,
+ADD PRIMARY KEY (id);
+
+-- Version 4: Drop foreign keys from History --
+ALTER TABLE Home_IMS.History
+DROP FOREIGN KEY History_item_id_fk,
+DROP FOREIGN KEY History_user_id_fk;
+
+-- Version 4: Include the partitioning column in the History primary key --
+ALTER TABLE Home_IMS.History
+DROP PRIMARY KEY,
+ADD PRIMARY KEY (id, timestamp);
+
+-- Version 4: Partition History by month --
+ALTER TABLE Home_IMS.History
+PARTITION BY RANGE COLUMNS (timestamp) (
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- Version 4: Drop foreign keys from Purchase --
+ALTER TABLE Home_IMS.Purchase
+DROP FOREIGN KEY Purchase_parent_id_fk,
+DROP FOREIGN KEY Purchase_item_id_fk;
+
+-- Version 4: Include the partitioning column in the Purchase primary key --
+ALTER TABLE Home_IMS.Purchase
+DROP PRIMARY KEY,
+ADD PRIMARY KEY (id, timestamp);
+
+-- Version 4: Partition Purchase by month --
+ALTER TABLE Home_IMS.Purchase
+PARTITION BY RANGE COLUMNS (timestamp) (
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- Version 4: Create Table HistorySummary --
+CREATE TABLE Home_IMS.HistorySummary (
+  id BIGINT NOT NULL AUTO_INCREMENT,
+  month DATE NOT NULL,
+  item_id INT NOT NULL,
+  wasted BOOLEAN NOT NULL,
+  user_id INT,
+  quantity FLOAT NOT NULL,
+  records INT NOT NULL,
+  PRIMARY KEY (id),
+  INDEX HistorySummary_month (month),
+  INDEX HistorySummary_item_id (item_id),
+  CONSTRAINT HistorySummary_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType (id),
+  CONSTRAINT HistorySummary_user_id_fk FOREIGN KEY (user_id) REFERENCES User (id)
+);
+
+-- Version 4: Create Table PurchaseSummary --
+CREATE TABLE Home_IMS.PurchaseSummary (
+  id BIGINT NOT NULL AUTO_INCREMENT,
+  month DATE NOT NULL,
+  item_id INT NOT NULL,
+  store VARCHAR(255) NOT NULL,
+  parent_id INT NOT NULL,
+  quantity FLOAT NOT NULL,
+  price FLOAT NOT NULL,
+  purchases INT NOT NULL,
+  PRIMARY KEY (id),
+  INDEX PurchaseSummary_month (month),
+  INDEX PurchaseSummary_item_id (item_id),
+  CONSTRAINT PurchaseSummary_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType (id),
+  CONSTRAINT PurchaseSummary_parent_id_fk FOREIGN KEY (parent_id) REFERENCES Parent (id)
+);
+
+-- Version 5: Create Table UsageRollup --
+CREATE TABLE Home_IMS.UsageRollup (
+  item_id INT NOT NULL,
+  day DATE NOT NULL,
+  used FLOAT NOT NULL DEFAULT 0,
+  wasted FLOAT NOT NULL DEFAULT 0,
+  spent FLOAT NOT NULL DEFAULT 0,
+  PRIMARY KEY (item_id, day),
+  CONSTRAINT UsageRollup_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType (id)
+);
+
+-- Version 5: Backfill UsageRollup --
+INSERT INTO Home_IMS.UsageRollup (item_id, day, used, wasted, spent)
+SELECT item_id, day, SUM(used), SUM(wasted), SUM(spent)
+FROM (
+       SELECT item_id,
+              DATE(timestamp) AS day,
+              CASE WHEN wasted = false THEN quantity ELSE 0 END AS used,
+              CASE WHEN wasted = true THEN quantity ELSE 0 END AS wasted,
+              0 AS spent
+       FROM Home_IMS.History
+            UNION ALL
+       SELECT item_id,
+              month,
+              CASE WHEN wasted = false THEN quantity ELSE 0 END,
+              CASE WHEN wasted = true THEN quantity ELSE 0 END,
+              0
+       FROM Home_IMS.HistorySummary
+            UNION ALL
+       SELECT item_id, DATE(timestamp), 0, 0, price
+       FROM Home_IMS.Purchase
+            UNION ALL
+       SELECT item_id, month, 0, 0, price
+       FROM Home_IMS.PurchaseSummary
+     ) AS U
+GROUP BY item_id, day;
+
+-- Version 6: Create Table OnHand --
+CREATE TABLE Home_IMS.OnHand (
+  item_id INT NOT NULL,
+  quantity FLOAT NOT NULL DEFAULT 0,
+  PRIMARY KEY (item_id),
+  CONSTRAINT OnHand_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType (id)
+);
+
+-- Version 6: Create Table OnHandLocation --
+CREATE TABLE Home_IMS.OnHandLocation (
+  item_id INT NOT NULL,
+  location_name VARCHAR(255) NOT NULL,
+  quantity FLOAT NOT NULL DEFAULT 0,
+  PRIMARY KEY (item_id, location_name),
+  CONSTRAINT OnHandLocation_item_id_fk FOREIGN KEY (item_id) REFERENCES ItemType (id),
+  CONSTRAINT OnHandLocation_location_name_fk FOREIGN KEY (location_name) REFERENCES Location (name)
+);
+
+-- Version 6: Backfill OnHand --
+INSERT INTO Home_IMS.OnHand (item_id, quantity)
+SELECT item_id, SUM(quantity)
+FROM Home_IMS.Inventory
+GROUP BY item_id;
+
+-- Version 6: Backfill OnHandLocation --
+INSERT INTO Home_IMS.OnHandLocation (item_id, location_name, quantity)
+SELECT I.item_id, S.location_name, SUM(I.quantity)
+FROM Home_IMS.Inventory AS I
+JOIN Home_IMS.Storage AS S ON S.id = I.storage_id
+GROUP BY I.item_id, S.location_name;
+
+-- Version 6: Create Trigger Inventory_after_insert --
+CREATE TRIGGER Home_IMS.Inventory_after_insert
+AFTER INSERT ON Home_IMS.Inventory
+FOR EACH ROW
+BEGIN
+INSERT INTO Home_IMS.OnHand (item_id, quantity)
+VALUES (NEW.item_id, NEW.quantity)
+ON DUPLICATE KEY UPDATE quantity = quantity + NEW.quantity;
+INSERT INTO Home_IMS.OnHandLocation (item_id, location_name, quantity)
+VALUES (NEW.item_id, (SELECT location_name FROM Home_IMS.Storage WHERE id = NEW.storage_id), NEW.quantity)
+ON DUPLICATE KEY UPDATE quantity = quantity + NEW.quantity;
+END;
+
+-- Version 6: Create Trigger Inventory_after_update --
+CREATE TRIGGER Home_IMS.Inventory_after_update
+AFTER UPDATE ON Home_IMS.Inventory
+FOR EACH ROW
+BEGIN
+UPDATE Home_IMS.OnHand
+SET quantity = quantity - OLD.quantity
+WHERE item_id = OLD.item_id;
+      UPDATE Home_IMS.OnHandLocation
+SET quantity = quantity - OLD.quantity
+WHERE item_id = OLD.item_id
+      AND location_name = (SELECT location_name FROM Home_IMS.Storage WHERE id = OLD.storage_id);
+      INSERT INTO Home_IMS.OnHand (item_id, quantity)
+      VALUES (NEW.item_id, NEW.quantity)
+      ON DUPLICATE KEY UPDATE quantity = quantity + NEW.quantity;
+      INSERT INTO Home_IMS.OnHandLocation (item_id, location_name, quantity)
+      VALUES (NEW.item_id, (SELECT location_name FROM Home_IMS.Storage WHERE id = NEW.storage_id), NEW.quantity)
+      ON DUPLICATE KEY UPDATE quantity = quantity + NEW.quantity;
+      END;
+
+-- Version 6: Create Trigger Inventory_after_delete --
+CREATE TRIGGER Home_IMS.Inventory_after_delete
+AFTER DELETE ON Home_IMS.Inventory
+FOR EACH ROW
+BEGIN
+UPDATE Home_IMS.OnHand
+SET quantity = quantity - OLD.quantity
+WHERE item_id = OLD.item_id;
+      UPDATE Home_IMS.OnHandLocation
+SET quantity = quantity - OLD.quantity
+WHERE item_id = OLD.item_id
+      AND location_name = (SELECT location_name FROM Home_IMS.Storage WHERE id = OLD.storage_id);
+      END;
+
+-- Version 7: Create Procedure RemoveAndLogInventory --
+CREATE PROCEDURE Home_IMS.RemoveAndLogInventory (
+  IN item_name VARCHAR(255),
+  IN storage_name VARCHAR(255),
+  IN item_timestamp DATETIME(6),
+  IN quantity_removed FLOAT,
+  IN user_name VARCHAR(255)
+)
+BEGIN
+DECLARE item INT;
+DECLARE storage INT;
+DECLARE EXIT HANDLER FOR SQLEXCEPTION
+BEGIN
+ROLLBACK;
+RESIGNAL;
+END;
+IF quantity_removed <= 0 THEN
+SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Quantity to remove must be greater than 0';
+END IF;
+SET item = (SELECT id FROM Home_IMS.ItemType WHERE name = item_name);
+SET storage = (SELECT id FROM Home_IMS.Storage AS S WHERE S.storage_name = storage_name);
+    START TRANSACTION;
+    UPDATE Home_IMS.Inventory
+SET quantity = quantity - quantity_removed
+WHERE item_id = item
+      AND storage_id = storage
+      AND timestamp = item_timestamp
+      AND quantity >= quantity_removed;
+      IF ROW_COUNT() = 0 THEN
+      IF NOT EXISTS (SELECT * FROM Home_IMS.Inventory WHERE item_id = item AND storage_id = storage AND timestamp = item_timestamp) THEN
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The item does not exist in inventory';
+      END IF;
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Cannot remove more than present in inventory';
+      END IF;
+      DELETE FROM Home_IMS.Inventory
+WHERE item_id = item
+      AND storage_id = storage
+      AND timestamp = item_timestamp
+      AND quantity <= 0;
+      IF user_name IS NULL THEN
+      INSERT INTO Home_IMS.History (item_id, quantity, wasted)
+      VALUES (item, quantity_removed, true);
+      INSERT INTO Home_IMS.UsageRollup (item_id, day, wasted)
+      VALUES (item, CURRENT_DATE, quantity_removed)
+      ON DUPLICATE KEY UPDATE wasted = wasted + VALUES(wasted);
+      ELSE
+      INSERT INTO Home_IMS.History (item_id, quantity, wasted, user_id)
+      VALUES (item, quantity_removed, false, (SELECT id FROM Home_IMS.User WHERE name = user_name));
+      INSERT INTO Home_IMS.UsageRollup (item_id, day, used)
+      VALUES (item, CURRENT_DATE, quantity_removed)
+      ON DUPLICATE KEY UPDATE used = used + VALUES(used);
+      END IF;
+      COMMIT;
+      END;
+
+-- Version 8: Index History by time --
+ALTER TABLE Home_IMS.History
+ADD INDEX History_timestamp (timestamp);
+
+-- Version 9: Index History by quantity --
+ALTER TABLE Home_IMS.History
+ADD INDEX History_quantity_timestamp (quantity, timestamp);
+
+-- Version 9: Index Purchase by quantity and price --
+ALTER TABLE Home_IMS.Purchase
+ADD INDEX Purchase_quantity_timestamp (quantity, timestamp),
+ADD INDEX Purchase_price_timestamp (price, timestamp);
+
+-- Version 10: Index Inventory by time added --
+ALTER TABLE Home_IMS.Inventory
+ADD INDEX Inventory_timestamp (timestamp);
+
+-- Version 11: Remove empty OnHandLocation totals --
+DELETE H
+FROM Home_IMS.OnHandLocation AS H
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM Home_IMS.Inventory AS I
+        JOIN Home_IMS.Storage AS S ON S.id = I.storage_id
+        WHERE I.item_id = H.item_id
+              AND S.location_name = H.location_name
+      );
+
+-- Version 11: Remove empty OnHand totals --
+DELETE H
+FROM Home_IMS.OnHand AS H
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM Home_IMS.Inventory AS I
+        WHERE I.item_id = H.item_id
+      );
+
+-- Version 11: Drop OnHandLocation location foreign key --
+ALTER TABLE Home_IMS.OnHandLocation
+DROP FOREIGN KEY OnHandLocation_location_name_fk;
+
+-- Version 11: Cascade deleted locations to OnHandLocation --
+ALTER TABLE Home_IMS.OnHandLocation
+ADD CONSTRAINT OnHandLocation_location_name_fk FOREIGN KEY (location_name) REFERENCES Home_IMS.Location (name) ON DELETE CASCADE;
+
 
 
 
@@ -172,21 +841,35 @@ CREATE TABLE IF NOT EXISTS Home_IMS.History (
 --- MealSchedule ---
 --------------------
 -- Schedule a meal --
-INSERT INTO Home_IMS.MealSchedule (recipe_name, timestamp, meal_type)
-VALUES (%s,  %s, %s);
+INSERT INTO Home_IMS.MealSchedule (recipe_id, timestamp, meal_type)
+VALUES ((SELECT id FROM Home_IMS.Template WHERE name = %s), %s, %s);
 
 -- Delete a meal --
 DELETE FROM Home_IMS.MealSchedule
-WHERE recipe_name = %s
+WHERE recipe_id = (SELECT id FROM Home_IMS.Template WHERE name = %s)
       AND timestamp = %s;
 
+-- Select ingredients of meals --
+SELECT I.food_id AS item_id, T.name AS food_name, SUM(I.quantity) AS quantity
+FROM JSON_TABLE(%s, '$[*]' COLUMNS (recipe_name VARCHAR(255) PATH '$.recipe_name', timestamp DATETIME PATH '$.timestamp')) AS J
+JOIN Home_IMS.Template AS R ON R.name = J.recipe_name
+JOIN Home_IMS.MealSchedule AS M ON M.recipe_id = R.id AND M.timestamp = J.timestamp
+JOIN Home_IMS.Ingredients AS I ON I.recipe_id = M.recipe_id
+JOIN Home_IMS.ItemType AS T ON T.id = I.food_id
+GROUP BY I.food_id;
+
+-- Delete meals --
+DELETE M
+FROM Home_IMS.MealSchedule AS M
+JOIN Home_IMS.Template AS R ON R.id = M.recipe_id
+JOIN JSON_TABLE(%s, '$[*]' COLUMNS (recipe_name VARCHAR(255) PATH '$.recipe_name', timestamp DATETIME PATH '$.timestamp')) AS J ON J.recipe_name = R.name AND J.timestamp = M.timestamp;
+
 -- Select meals --
-SELECT recipe_name, timestamp, meal_type
-FROM Home_IMS.MealSchedule
-WHERE recipe_name LIKE %s ESCAPE '!'
-      AND timestamp BETWEEN %s AND %s
-      AND meal_type LIKE %s ESCAPE '!'
-      ORDER BY timestamp DESC;
+SELECT T.name AS recipe_name, M.timestamp, M.meal_type
+FROM Home_IMS.MealSchedule AS M
+JOIN Home_IMS.Template AS T ON T.id = M.recipe_id
+     {where}
+     ORDER BY M.timestamp DESC;
 
 
 ----------------
@@ -196,6 +879,10 @@ WHERE recipe_name LIKE %s ESCAPE '!'
 INSERT INTO Home_IMS.ItemType (name, unit)
 VALUES (%s, %s);
 
+-- Select item type names --
+SELECT name
+FROM Home_IMS.ItemType;
+
 -- Select item type --
 SELECT name, unit
 FROM Home_IMS.ItemType
@@ -207,13 +894,13 @@ WHERE name LIKE %s
 --- Consumable ---
 ------------------
 -- Add consumable type --
-INSERT INTO Home_IMS.Consumable (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Consumable (id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s));
 
 -- Select consumable type --
 SELECT I.name, I.unit
 FROM Home_IMS.ItemType AS I
-JOIN Home_IMS.Consumable AS C ON I.name = C.name
+JOIN Home_IMS.Consumable AS C ON I.id = C.id
 WHERE I.name LIKE %s
       AND I.unit LIKE %s;
 
@@ -222,13 +909,13 @@ WHERE I.name LIKE %s
 --- Durable ---
 ---------------
 -- Add durable type --
-INSERT INTO Home_IMS.Durable (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Durable (id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s));
 
 -- Select durable type --
 SELECT I.name, I.unit
 FROM Home_IMS.ItemType AS I
-JOIN Home_IMS.Durable AS C ON I.name = C.name
+JOIN Home_IMS.Durable AS C ON I.id = C.id
 WHERE I.name LIKE %s
       AND I.unit LIKE %s;
 
@@ -237,26 +924,26 @@ WHERE I.name LIKE %s
 --- Food ---
 ------------
 -- Add food type --
-INSERT INTO Home_IMS.Food (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Food (id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s));
 
 -- Select food type --
 SELECT T.name, T.unit
 FROM Home_IMS.ItemType AS T
-JOIN Home_IMS.Food AS F ON T.name = F.name;
+JOIN Home_IMS.Food AS F ON T.id = F.id;
 
 
 ---------------
 --- NotFood ---
 ---------------
 -- Add notfood type --
-INSERT INTO Home_IMS.NotFood (name)
-VALUES (%s);
+INSERT INTO Home_IMS.NotFood (id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s));
 
 -- Select not food type --
 SELECT I.name, I.unit
 FROM Home_IMS.ItemType AS I
-JOIN Home_IMS.NotFood AS C ON I.name = C.name
+JOIN Home_IMS.NotFood AS C ON I.id = C.id
 WHERE I.name LIKE %s
       AND I.unit LIKE %s;
 
@@ -296,22 +983,26 @@ WHERE storage_name LIKE %s
       AND location_name LIKE %s
       AND capacity BETWEEN %s AND %s;
 
+-- Select storage names --
+SELECT storage_name AS name
+FROM Home_IMS.Storage;
+
 
 -----------
 --- Dry ---
 -----------
 -- Add dry storage --
-INSERT INTO Home_IMS.Dry (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Dry (id)
+VALUES ((SELECT id FROM Home_IMS.Storage WHERE storage_name = %s));
 
 -- Delete dry storage --
 DELETE FROM Home_IMS.Dry
-WHERE name = %s;
+WHERE id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s);
 
 -- Select dry storage --
 SELECT S.storage_name, S.location_name, S.capacity
 FROM Home_IMS.Storage as S
-JOIN Home_IMS.Dry as D ON S.storage_name = D.name
+JOIN Home_IMS.Dry as D ON S.id = D.id
 WHERE S.storage_name LIKE %s
       AND S.location_name LIKE %s
       AND S.capacity BETWEEN %s AND %s;
@@ -321,17 +1012,17 @@ WHERE S.storage_name LIKE %s
 --- Appliance ---
 -----------------
 -- Add appliance storage --
-INSERT INTO Home_IMS.Appliance (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Appliance (id)
+VALUES ((SELECT id FROM Home_IMS.Storage WHERE storage_name = %s));
 
 -- Delete appliance storage --
 DELETE FROM Home_IMS.Appliance
-WHERE name = %s;
+WHERE id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s);
 
 -- Select appliance storage --
 SELECT S.storage_name, S.location_name, S.capacity
 FROM Home_IMS.Storage as S
-JOIN Home_IMS.Appliance as A ON S.storage_name = A.name
+JOIN Home_IMS.Appliance as A ON S.id = A.id
 WHERE S.storage_name LIKE %s
       AND S.location_name LIKE %s
       AND S.capacity BETWEEN %s AND %s;
@@ -341,17 +1032,17 @@ WHERE S.storage_name LIKE %s
 --- Fridge ---
 --------------
 -- Add fridge storage --
-INSERT INTO Home_IMS.Fridge (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Fridge (id)
+VALUES ((SELECT id FROM Home_IMS.Storage WHERE storage_name = %s));
 
 -- Delete fridge storage --
 DELETE FROM Home_IMS.Fridge
-WHERE name = %s;
+WHERE id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s);
 
 -- Select fridge storage --
 SELECT S.storage_name, S.location_name, S.capacity
 FROM Home_IMS.Storage as S
-JOIN Home_IMS.Fridge as F ON S.storage_name = F.name
+JOIN Home_IMS.Fridge as F ON S.id = F.id
 WHERE S.storage_name LIKE %s
       AND S.location_name LIKE %s
       AND S.capacity BETWEEN %s AND %s;
@@ -361,17 +1052,17 @@ WHERE S.storage_name LIKE %s
 --- Freezer ---
 ---------------
 -- Add freezer storage --
-INSERT INTO Home_IMS.Freezer (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Freezer (id)
+VALUES ((SELECT id FROM Home_IMS.Storage WHERE storage_name = %s));
 
 -- Delete freezer storage --
 DELETE FROM Home_IMS.Freezer
-WHERE name = %s;
+WHERE id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s);
 
 -- Select freezer storage --
 SELECT S.storage_name, S.location_name, S.capacity
 FROM Home_IMS.Storage as S
-JOIN Home_IMS.Freezer as F ON S.storage_name = F.name
+JOIN Home_IMS.Freezer as F ON S.id = F.id
 WHERE S.storage_name LIKE %s
       AND S.location_name LIKE %s
       AND S.capacity BETWEEN %s AND %s;
@@ -386,184 +1077,213 @@ VALUES (%s);
 
 -- Select users --
 SELECT name, EXISTS (
-          SELECT P.name
+          SELECT P.id
           FROM Home_IMS.Parent AS P
-          WHERE P.name = U.name
+          WHERE P.id = U.id
        ) AS is_parent
 FROM Home_IMS.User as U
 WHERE U.name LIKE %s;
 
 -- Select items used by user --
-SELECT item_name, timestamp
-FROM Home_IMS.History
-WHERE user_name = %s;
+SELECT T.name AS item_name, H.timestamp
+FROM Home_IMS.History AS H
+JOIN Home_IMS.ItemType AS T ON T.id = H.item_id
+WHERE H.user_id = (SELECT id FROM Home_IMS.User WHERE name = %s);
 
 
 --------------
 --- Parent ---
 --------------
 -- Add parent --
-INSERT INTO Home_IMS.Parent (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Parent (id)
+VALUES ((SELECT id FROM Home_IMS.User WHERE name = %s));
 
 -- Select parents --
-SELECT name
-FROM Home_IMS.Parent
-WHERE name LIKE %s;
+SELECT U.name
+FROM Home_IMS.User AS U
+JOIN Home_IMS.Parent AS P ON P.id = U.id
+WHERE U.name LIKE %s;
 
 
 -----------------
 --- Dependent ---
 -----------------
 -- Add dependent --
-INSERT INTO Home_IMS.Dependent (name)
-VALUES (%s);
+INSERT INTO Home_IMS.Dependent (id)
+VALUES ((SELECT id FROM Home_IMS.User WHERE name = %s));
 
 
 ---------------
 --- History ---
 ---------------
 -- Select history records --
-SELECT H.item_name, H.timestamp, H.quantity, T.unit, H.wasted, H.user_name
+SELECT H.id, T.name AS item_name, H.timestamp, H.quantity, T.unit, H.wasted, U.name AS user_name,
+       CAST(H.quantity AS DOUBLE) AS quantity_key
 FROM Home_IMS.History AS H
-JOIN Home_IMS.ItemType AS T ON H.item_name = T.name;
+JOIN Home_IMS.ItemType AS T ON H.item_id = T.id
+     LEFT JOIN Home_IMS.User AS U ON U.id = H.user_id
+     {where}
+     {order}
+     {limit};
 
 -- Select usage statistics --
-SELECT H.item_name,
+SELECT T.name AS item_name,
        T.unit,
-       SUM(CASE WHEN H.wasted = false THEN H.quantity ELSE 0 END) AS amt_used,
-       SUM(CASE WHEN H.wasted = true THEN H.quantity ELSE 0 END) AS amt_wasted,
-       (
-           SELECT IFNULL(SUM(P.price), 0)
-           FROM Home_IMS.Purchase AS P
-           WHERE P.item_name = H.item_name
-       ) AS money_spent
-FROM Home_IMS.History AS H
-JOIN Home_IMS.ItemType AS T ON H.item_name = T.name
-GROUP BY H.item_name;
+       SUM(R.used) AS amt_used,
+       SUM(R.wasted) AS amt_wasted,
+       SUM(R.spent) AS money_spent
+FROM Home_IMS.UsageRollup AS R
+JOIN Home_IMS.ItemType AS T ON R.item_id = T.id
+GROUP BY R.item_id;
 
 
 --------------
 --- Wasted ---
 --------------
 -- Add item wasted record --
-INSERT INTO Home_IMS.History (item_name, quantity, wasted)
-VALUES (%s, %s, true);
+INSERT INTO Home_IMS.History (item_id, quantity, wasted)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), %s, true);
 
 -- Select waste records --
-SELECT item_name, timestamp, quantity
-FROM Home_IMS.History
-WHERE wasted = true
-      AND item_name LIKE %s ESCAPE '!'
-      AND timestamp BETWEEN %s AND %s;
+SELECT T.name AS item_name, H.timestamp, H.quantity
+FROM Home_IMS.History AS H
+JOIN Home_IMS.ItemType AS T ON T.id = H.item_id
+WHERE H.wasted = true
+      AND T.name LIKE %s ESCAPE '!'
+      AND H.timestamp BETWEEN %s AND %s;
 
 
 ------------
 --- Used ---
 ------------
 -- Add item used record --
-INSERT INTO Home_IMS.History (item_name, quantity, wasted, user_name)
-VALUES (%s, %s, false, %s);
+INSERT INTO Home_IMS.History (item_id, quantity, wasted, user_id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), %s, false, (SELECT id FROM Home_IMS.User WHERE name = %s));
 
 -- Select used records --
-SELECT item_name, timestamp, quantity, user_name
-FROM Home_IMS.History
-WHERE wasted = false
-      AND item_name LIKE %s ESCAPE '!'
-      AND timestamp BETWEEN %s AND %s
-      AND user_name LIKE %s ESCAPE '!';
+SELECT T.name AS item_name, H.timestamp, H.quantity, U.name AS user_name
+FROM Home_IMS.History AS H
+JOIN Home_IMS.ItemType AS T ON T.id = H.item_id
+JOIN Home_IMS.User AS U ON U.id = H.user_id
+WHERE H.wasted = false
+      AND T.name LIKE %s ESCAPE '!'
+      AND H.timestamp BETWEEN %s AND %s
+      AND U.name LIKE %s ESCAPE '!';
 
 
 ----------------
 --- Purchase ---
 ----------------
 -- Add purchase record --
-INSERT INTO Home_IMS.Purchase (item_name, quantity, price, store, parent_name)
-VALUES (%s, %s, %s, %s, %s);
+INSERT INTO Home_IMS.Purchase (item_id, quantity, price, store, parent_id)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), %s, %s, %s, (SELECT id FROM Home_IMS.User WHERE name = %s));
 
 -- Select purchases --
-SELECT P.item_name, P.timestamp, P.quantity, T.unit, P.price, P.store, P.parent_name
+SELECT P.id, T.name AS item_name, P.timestamp, P.quantity, T.unit, P.price, P.store, U.name AS parent_name,
+       CAST(P.quantity AS DOUBLE) AS quantity_key, CAST(P.price AS DOUBLE) AS price_key
 FROM Home_IMS.Purchase AS P
-JOIN Home_IMS.ItemType AS T ON P.item_name = T.name;
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+     {where}
+     {order}
+     {limit};
 
 -- Get most expensive purchase --
-SELECT MAX(price) AS price
-FROM Home_IMS.Purchase
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s
-      AND parent_name LIKE %s;
+SELECT MAX(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+      AND U.name LIKE %s;
 
 -- Get most expensive purchase price by item name --
-SELECT MAX(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY item_name
-WHERE timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s
-      AND parent_name LIKE %s;
+SELECT MAX(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+      AND U.name LIKE %s
+GROUP BY P.item_id;
 
 -- Get most expensive purchase price by parent name --
-SELECT MAX(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY parent_name
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s;
+SELECT MAX(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+GROUP BY P.parent_id;
 
 -- Get most expensive purchase price by store --
-SELECT MAX(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY store
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND parent_name LIKE %s;
+SELECT MAX(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND U.name LIKE %s
+GROUP BY P.store;
 
 -- Get average purchase price --
-SELECT AVG(price) AS price
-FROM Home_IMS.Purchase
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s
-      AND parent_name LIKE %s;
+SELECT AVG(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+      AND U.name LIKE %s;
 
 -- Get average purchase price by item name --
-SELECT AVG(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY item_name
-WHERE timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s
-      AND parent_name LIKE %s;
+SELECT AVG(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+      AND U.name LIKE %s
+GROUP BY P.item_id;
 
 -- Get average purchase price by parent name --
-SELECT AVG(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY parent_name
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND store LIKE %s;
+SELECT AVG(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND P.store LIKE %s
+GROUP BY P.parent_id;
 
 -- Get average purchase price by store --
-SELECT AVG(price) AS price
-FROM Home_IMS.Purchase
-GROUP BY store
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND quantity BETWEEN %s AND %s
-      AND parent_name LIKE %s;
+SELECT AVG(P.price) AS price
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND P.quantity BETWEEN %s AND %s
+      AND U.name LIKE %s
+GROUP BY P.store;
 
 -- Get total cost --
-SELECT SUM(price)
-FROM Home_IMS.Purchase
-WHERE item_name LIKE %s
-      AND timestamp BETWEEN %s AND %s
-      AND parent_name LIKE %s;
+SELECT SUM(P.price)
+FROM Home_IMS.Purchase AS P
+JOIN Home_IMS.ItemType AS T ON P.item_id = T.id
+JOIN Home_IMS.User AS U ON P.parent_id = U.id
+WHERE T.name LIKE %s
+      AND P.timestamp BETWEEN %s AND %s
+      AND U.name LIKE %s;
 
 
 ----------------
@@ -582,129 +1302,322 @@ WHERE name = %s;
 --- Recipe ---
 --------------
 -- Create recipe --
-INSERT INTO Home_IMS.Recipe (recipe_name)
-VALUES (%s);
+INSERT INTO Home_IMS.Recipe (id)
+VALUES ((SELECT id FROM Home_IMS.Template WHERE name = %s));
 
 -- Delete recipe --
 DELETE FROM Home_IMS.Recipe
-WHERE recipe_name = %s;
+WHERE id = (SELECT id FROM Home_IMS.Template WHERE name = %s);
 
 -- View recipes --
-SELECT R.recipe_name
+SELECT T.name AS recipe_name
 FROM Home_IMS.Recipe AS R
-WHERE R.recipe_name LIKE %s ESCAPE '!';
+JOIN Home_IMS.Template AS T ON T.id = R.id
+WHERE T.name LIKE %s ESCAPE '!';
+
+-- Select recipe names --
+SELECT T.name
+FROM Home_IMS.Recipe AS R
+JOIN Home_IMS.Template AS T ON T.id = R.id;
 
 -- Get estimated recipe cost --
-SELECT R.recipe_name, SUM(P.avg_item_price) as cost
-FROM Home_IMS.Recipe AS R, Home_IMS.Ingredients AS I,
-     ( SELECT item_name, AVG(price) as avg_item_price
+SELECT T.name AS recipe_name, SUM(P.avg_item_price) as cost
+FROM Home_IMS.Recipe AS R
+JOIN Home_IMS.Template AS T ON T.id = R.id
+JOIN Home_IMS.Ingredients AS I ON I.recipe_id = R.id
+JOIN (
+       SELECT item_id, AVG(price) as avg_item_price
        FROM Home_IMS.Purchase
-       GROUP BY item_name
-     ) AS P
-GROUP BY R.recipe_name
-WHERE R.recipe_name = I.recipe_name
-      AND I.food_name = P.item_name
-      AND R.recipe_name LIKE %s;
+       GROUP BY item_id
+     ) AS P ON P.item_id = I.food_id
+WHERE T.name LIKE %s
+GROUP BY R.id;
 
 -- Search recipes by ingredient --
-SELECT DISTINCT R.recipe_name
+SELECT DISTINCT T.name AS recipe_name
+FROM Home_IMS.Ingredients AS I
+JOIN Home_IMS.ItemType AS F ON F.id = I.food_id
+JOIN Home_IMS.Template AS T ON T.id = I.recipe_id
+WHERE F.name LIKE %s ESCAPE '!';
+
+-- Select recipe ingredient names --
+SELECT T.name AS recipe_name, F.name AS food_name
 FROM Home_IMS.Recipe AS R
-JOIN Home_IMS.Ingredients AS I
-     ON R.recipe_name = I.recipe_name
-WHERE I.food_name LIKE %s ESCAPE '!';
+JOIN Home_IMS.Template AS T ON T.id = R.id
+     LEFT JOIN Home_IMS.Ingredients AS I ON I.recipe_id = R.id
+     LEFT JOIN Home_IMS.ItemType AS F ON F.id = I.food_id;
+
+-- Select recipe feasibility --
+SELECT T.name AS recipe_name, S.food_name, S.unit, S.quantity
+FROM Home_IMS.Recipe AS R
+JOIN Home_IMS.Template AS T ON T.id = R.id
+     LEFT JOIN (
+           SELECT I.recipe_id, F.name AS food_name, F.unit, I.quantity - IFNULL(H.quantity, 0) AS quantity
+           FROM Home_IMS.Ingredients AS I
+           JOIN Home_IMS.ItemType AS F ON F.id = I.food_id
+                LEFT JOIN Home_IMS.OnHand AS H ON H.item_id = I.food_id
+           WHERE I.quantity > IFNULL(H.quantity, 0)
+     ) AS S ON S.recipe_id = R.id
+WHERE T.name LIKE %s ESCAPE '!'
+      ORDER BY T.name;
 
 
 -------------------
 --- Ingredients ---
 -------------------
 -- Add ingredient --
-INSERT INTO Home_IMS.Ingredients (recipe_name, food_name, quantity)
-VALUES (%s, %s, %s);
+INSERT INTO Home_IMS.Ingredients (recipe_id, food_id, quantity)
+VALUES ((SELECT id FROM Home_IMS.Template WHERE name = %s), (SELECT id FROM Home_IMS.ItemType WHERE name = %s), %s);
 
 -- Remove ingredient --
 DELETE FROM Home_IMS.Ingredients
-WHERE food_name = %s
-      AND recipe_name = %s;
+WHERE food_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND recipe_id = (SELECT id FROM Home_IMS.Template WHERE name = %s);
 
 -- Change ingredient quantity --
 UPDATE Home_IMS.Ingredients AS I
 SET I.quantity = %s
-WHERE I.food_name = %s
-      AND I.recipe_name = %s;
+WHERE I.food_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND I.recipe_id = (SELECT id FROM Home_IMS.Template WHERE name = %s);
 
 -- View ingredients for a recipe --
-SELECT food_name, quantity
-FROM Home_IMS.Ingredients
-WHERE recipe_name LIKE %s;
+SELECT F.name AS food_name, I.quantity
+FROM Home_IMS.Ingredients AS I
+JOIN Home_IMS.ItemType AS F ON F.id = I.food_id
+JOIN Home_IMS.Template AS T ON T.id = I.recipe_id
+WHERE T.name LIKE %s;
 
 -- Search inventory by ingredients --
-SELECT S.item_name, S.storage_name, S.timestamp, S.quantity
-FROM Home_IMS.Inventory AS S
-JOIN Home_IMS.Ingredients AS I ON I.food_name = S.item_name
-WHERE I.recipe_name = %s
-      ORDER BY ISNULL(S.expiry), S.expiry;
+SELECT T.name AS item_name, S.storage_name, V.timestamp, V.quantity
+FROM Home_IMS.Ingredients AS I
+JOIN Home_IMS.Inventory AS V ON V.item_id = I.food_id
+JOIN Home_IMS.ItemType AS T ON T.id = V.item_id
+JOIN Home_IMS.Storage AS S ON S.id = V.storage_id
+WHERE I.recipe_id = (SELECT id FROM Home_IMS.Template WHERE name = %s)
+      ORDER BY ISNULL(V.expiry), V.expiry;
 
 
 -----------------
 --- Inventory ---
 -----------------
 -- Add item to inventory --
-INSERT INTO Home_IMS.Inventory (item_name, storage_name, expiry, quantity)
-VALUES (%s, %s, %s, %s);
+INSERT INTO Home_IMS.Inventory (item_id, storage_id, expiry, quantity)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s), %s, %s);
 
 -- Remove item from inventory --
 DELETE FROM Home_IMS.Inventory
-WHERE item_name = %s
-      AND storage_name = %s
+WHERE item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND storage_id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s)
       AND timestamp = %s;
 
 -- Change item quantity --
 UPDATE Home_IMS.Inventory AS I
 SET I.quantity = %s
-WHERE I.item_name = %s
-      AND I.storage_name = %s
+WHERE I.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND I.storage_id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s)
+      AND I.timestamp = %s;
+
+-- Move item storage location --
+UPDATE Home_IMS.Inventory AS I
+SET I.storage_id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s)
+WHERE I.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND I.storage_id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s)
       AND I.timestamp = %s;
 
 -- View inventory items --
-SELECT I.item_name, I.storage_name, S.location_name, I.timestamp, I.expiry, I.quantity, T.unit
+SELECT T.name AS item_name, S.storage_name, S.location_name, I.timestamp, I.expiry, I.quantity, T.unit
 FROM Home_IMS.Inventory AS I
-JOIN Home_IMS.ItemType AS T ON I.item_name = T.name
-JOIN Home_IMS.Storage AS S ON S.storage_name = I.storage_name
-WHERE I.item_name LIKE %s ESCAPE '!'
-      AND I.storage_name LIKE %s ESCAPE '!'
-      AND (I.expiry BETWEEN %s AND %s OR (I.expiry IS NULL AND %s))
-      ORDER BY ISNULL(I.expiry), I.expiry;
+JOIN Home_IMS.ItemType AS T ON I.item_id = T.id
+JOIN Home_IMS.Storage AS S ON S.id = I.storage_id
+     {where}
+     {order}
+     {limit};
 
 -- Select item quantity from inventory --
 SELECT I.quantity
 FROM Home_IMS.Inventory AS I
-WHERE I.item_name = %s
-      AND I.storage_name = %s
+WHERE I.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND I.storage_id = (SELECT id FROM Home_IMS.Storage WHERE storage_name = %s)
       AND I.timestamp = %s;
 
+-- Remove and log item --
+CALL Home_IMS.RemoveAndLogInventory(%s, %s, %s, %s, %s);
+
+-- Select lots of item --
+SELECT I.item_id, I.storage_id, I.timestamp, CAST(I.quantity AS DOUBLE) AS quantity
+FROM Home_IMS.Inventory AS I
+JOIN Home_IMS.Storage AS S ON S.id = I.storage_id
+WHERE I.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND S.location_name LIKE %s
+      ORDER BY ISNULL(I.expiry), I.expiry, I.timestamp
+      FOR UPDATE;
+
+-- Select lots of items --
+SELECT I.item_id, I.storage_id, I.timestamp, CAST(I.quantity AS DOUBLE) AS quantity
+FROM JSON_TABLE(%s, '$[*]' COLUMNS (item_id INT PATH '$')) AS J
+JOIN Home_IMS.Inventory AS I ON I.item_id = J.item_id
+     ORDER BY I.item_id, ISNULL(I.expiry), I.expiry, I.timestamp
+     FOR UPDATE;
+
+-- Take from lots --
+UPDATE Home_IMS.Inventory AS I
+JOIN JSON_TABLE(%s, '$[*]' COLUMNS (
+             item_id INT PATH '$.item_id',
+             storage_id INT PATH '$.storage_id',
+             timestamp DATETIME(6) PATH '$.timestamp',
+             taken DOUBLE PATH '$.taken'
+       )) AS L ON I.item_id = L.item_id AND I.storage_id = L.storage_id AND I.timestamp = L.timestamp
+SET I.quantity = GREATEST(I.quantity - L.taken, 0);
+
+-- Remove empty lots --
+DELETE I
+FROM Home_IMS.Inventory AS I
+JOIN JSON_TABLE(%s, '$[*]' COLUMNS (item_id INT PATH '$')) AS J ON I.item_id = J.item_id
+WHERE I.quantity <= 0;
+
 
 ---------------------
 --- Shopping List ---
 ---------------------
 -- Select missing ingredients --
-SELECT Required.food_name, Required.unit, Required.total - IFNULL(Stock.total, 0) AS quantity
-FROM (
-       SELECT I.food_name, T.unit, SUM(I.quantity) as total
-       FROM Home_IMS.MealSchedule AS M
-       JOIN Home_IMS.Ingredients AS I ON I.recipe_name = M.recipe_name
-       JOIN Home_IMS.ItemType AS T ON I.food_name = T.name
-       WHERE M.timestamp <= %s
-       GROUP BY I.food_name
-     ) AS Required
-           LEFT JOIN (
-       SELECT S.item_name, SUM(S.quantity) AS total
-       FROM Home_IMS.Inventory AS S
-       WHERE EXISTS (
-               SELECT * FROM Home_IMS.MealSchedule AS M
-               JOIN Home_IMS.Ingredients AS I ON M.recipe_name = I.recipe_name
-               WHERE M.timestamp <= %s
-                     AND I.food_name = S.item_name
-             )
-       GROUP BY S.item_name
-     ) AS Stock ON Required.food_name = Stock.item_name
-     HAVING quantity > 0;
\ No newline at end of file
+WITH Required AS (
+      SELECT I.food_id, SUM(I.quantity) AS total
+      FROM Home_IMS.MealSchedule AS M
+      JOIN Home_IMS.Ingredients AS I ON I.recipe_id = M.recipe_id
+      WHERE M.timestamp BETWEEN %s AND %s
+      GROUP BY I.food_id
+      ), Stock AS (
+      SELECT H.item_id, SUM(H.quantity) AS total
+      FROM Required AS R
+      JOIN Home_IMS.OnHandLocation AS H ON H.item_id = R.food_id
+      WHERE H.location_name LIKE %s
+      GROUP BY H.item_id
+)
+SELECT T.name AS food_name,
+       T.unit,
+       R.total - IFNULL(S.total, 0) AS quantity
+FROM Required AS R
+JOIN Home_IMS.ItemType AS T ON T.id = R.food_id
+     LEFT JOIN Stock AS S ON S.item_id = R.food_id
+WHERE R.total - IFNULL(S.total, 0) > 0;
+
+
+---------------------
+--- SchemaVersion ---
+---------------------
+-- Select schema version --
+SELECT IFNULL(MAX(version), 0) AS version
+FROM Home_IMS.SchemaVersion;
+
+-- Add schema version --
+INSERT INTO Home_IMS.SchemaVersion (version)
+VALUES (%s);
+
+
+------------------
+--- Partitions ---
+------------------
+-- Select partitions --
+SELECT PARTITION_NAME AS partition_name
+FROM INFORMATION_SCHEMA.PARTITIONS
+WHERE TABLE_SCHEMA = 'Home_IMS'
+      AND TABLE_NAME = %s
+      ORDER BY PARTITION_ORDINAL_POSITION;
+
+-- Select earliest record --
+SELECT MIN(timestamp) AS earliest
+FROM Home_IMS.{table};
+
+-- Split future partition --
+ALTER TABLE Home_IMS.{table}
+REORGANIZE PARTITION p_future INTO (
+  {partitions},
+  PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- Drop partition --
+ALTER TABLE Home_IMS.{table}
+DROP PARTITION {partition};
+
+
+----------------------
+--- HistorySummary ---
+----------------------
+-- Delete history summary month --
+DELETE FROM Home_IMS.HistorySummary
+WHERE month = %s;
+
+-- Summarise history month --
+INSERT INTO Home_IMS.HistorySummary (month, item_id, wasted, user_id, quantity, records)
+SELECT %s, item_id, wasted, user_id, SUM(quantity), COUNT(*)
+FROM Home_IMS.History
+WHERE timestamp >= %s
+      AND timestamp < %s
+GROUP BY item_id, wasted, user_id;
+
+
+-----------------------
+--- PurchaseSummary ---
+-----------------------
+-- Delete purchase summary month --
+DELETE FROM Home_IMS.PurchaseSummary
+WHERE month = %s;
+
+-- Summarise purchase month --
+INSERT INTO Home_IMS.PurchaseSummary (month, item_id, store, parent_id, quantity, price, purchases)
+SELECT %s, item_id, store, parent_id, SUM(quantity), SUM(price), COUNT(*)
+FROM Home_IMS.Purchase
+WHERE timestamp >= %s
+      AND timestamp < %s
+GROUP BY item_id, store, parent_id;
+
+
+-------------------
+--- UsageRollup ---
+-------------------
+-- Add used to rollup --
+INSERT INTO Home_IMS.UsageRollup (item_id, day, used)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), CURRENT_DATE, %s)
+ON DUPLICATE KEY UPDATE used = used + VALUES(used);
+
+-- Add wasted to rollup --
+INSERT INTO Home_IMS.UsageRollup (item_id, day, wasted)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), CURRENT_DATE, %s)
+ON DUPLICATE KEY UPDATE wasted = wasted + VALUES(wasted);
+
+-- Add spent to rollup --
+INSERT INTO Home_IMS.UsageRollup (item_id, day, spent)
+VALUES ((SELECT id FROM Home_IMS.ItemType WHERE name = %s), CURRENT_DATE, %s)
+ON DUPLICATE KEY UPDATE spent = spent + VALUES(spent);
+
+-- Select consumption since --
+SELECT T.name AS item_name,
+       T.unit,
+       R.day,
+       R.used + R.wasted AS consumed,
+       IFNULL(H.quantity, 0) AS on_hand
+FROM Home_IMS.UsageRollup AS R
+JOIN Home_IMS.ItemType AS T ON T.id = R.item_id
+     LEFT JOIN (
+           SELECT item_id, SUM(quantity) AS quantity
+           FROM Home_IMS.OnHandLocation
+           WHERE location_name LIKE %s
+           GROUP BY item_id
+     ) AS H ON H.item_id = R.item_id
+WHERE R.day >= %s
+      AND R.used + R.wasted > 0;
+
+
+--------------
+--- OnHand ---
+--------------
+-- Select item on hand --
+SELECT H.quantity
+FROM Home_IMS.OnHand AS H
+WHERE H.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s);
+
+-- Select item on hand at location --
+SELECT H.quantity
+FROM Home_IMS.OnHandLocation AS H
+WHERE H.item_id = (SELECT id FROM Home_IMS.ItemType WHERE name = %s)
+      AND H.location_name = %s;
\ No newline at end of file
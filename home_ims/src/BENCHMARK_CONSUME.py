@@ -0,0 +1,86 @@
+"""
+Benchmarks how many history records per second the database takes while
+several users consume items from the inventory at the same time.
+
+Each consumer has its own connection and fully consumes its own share of the
+benchmark's inventory lots with `consume_inventory()`, which logs one history
+record per lot. The lots are added up front and are not timed.
+
+This writes to the configured database. It adds a "Benchmark" location,
+storage, user and item types, and leaves the history records it logs, so run
+it against a test or demo database and reset it afterwards with
+RESET_DATABASE_TO_DEMO.py.
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Database import Database
+
+CONSUMERS = 8
+LOTS_PER_CONSUMER = 250
+ITEM_TYPES = 20
+
+LOCATION = "Benchmark"
+STORAGE = "Benchmark pantry"
+USER = "Benchmark user"
+
+def item_name(i:int) -> str:
+    return f"Benchmark item {i}"
+
+
+setup = Database()
+dba = setup.db_actions
+
+# Ignore failures from previous runs having already added these
+dba.add_location(LOCATION)
+dba.add_dry_storage(STORAGE, LOCATION)
+dba.add_user(USER)
+for i in range(ITEM_TYPES):
+    dba.add_food_type(item_name(i))
+
+print(f"Adding {CONSUMERS * LOTS_PER_CONSUMER} lots to the inventory...")
+for i in range(CONSUMERS * LOTS_PER_CONSUMER):
+    result = dba.add_item_to_inventory(item_name(i % ITEM_TYPES), STORAGE, quantity=1.0)
+    if not result.is_success():
+        print(f"Could not add to the inventory: {result.get_error_message()}")
+        sys.exit(1)
+
+lots = dba.view_inventory_items(storage_name=STORAGE).get_data_list()
+lots = [lot for lot in lots if lot["storage_name"] == STORAGE]
+setup.close()
+
+shares = [lots[i::CONSUMERS] for i in range(CONSUMERS)]
+start = threading.Barrier(CONSUMERS + 1)
+
+def consume(share:list[dict]) -> int:
+    """
+    Consumes every lot of the share on a connection of its own once every
+    consumer is ready, and gets the number of lots that failed.
+    """
+    database = Database()
+    start.wait()
+
+    failed = 0
+    for lot in share:
+        result = database.db_actions.consume_inventory(
+            lot["item_name"], lot["storage_name"], lot["timestamp"], lot["quantity"], USER
+        )
+        if not result.is_success():
+            failed += 1
+
+    database.close()
+    return failed
+
+with ThreadPoolExecutor(max_workers=CONSUMERS) as executor:
+    futures = [executor.submit(consume, share) for share in shares]
+    start.wait()
+    began = time.perf_counter()
+    failed = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - began
+
+inserted = len(lots) - failed
+print(f"{CONSUMERS} consumers logged {inserted} history records in {elapsed:.2f} s: {inserted / elapsed:.0f} inserts per second")
+if failed:
+    print(f"{failed} lots could not be consumed")
@@ -0,0 +1,91 @@
+"""
+Benchmarks how long the shopping list takes to generate with thousands of
+meals scheduled.
+
+Benchmark recipes are scheduled several times a day for a year around today,
+with part of their ingredients in stock, and `gen_shopping_list()` is then
+timed over the date ranges the shopping list is usually made for.
+
+This writes to the configured database. It adds a "Benchmark" location,
+storage, item types and recipes, and schedules the meals, so run it against
+a test or demo database and reset it afterwards with RESET_DATABASE_TO_DEMO.py.
+"""
+import datetime as dt
+import statistics
+import sys
+import time
+
+from Database import Database
+
+MEALS = 5000
+RECIPES = 50
+INGREDIENTS = 100
+INGREDIENTS_PER_RECIPE = 6
+DAYS = 365
+RUNS = 10
+
+LOCATION = "Benchmark"
+STORAGE = "Benchmark pantry"
+
+# The ranges the shopping list is made for, from now
+RANGES = {
+    "Next week": dt.timedelta(days=7),
+    "Next month": dt.timedelta(days=30),
+    "Next 3 months": dt.timedelta(days=90),
+}
+
+def ingredient_name(i:int) -> str:
+    return f"Benchmark ingredient {i}"
+
+def recipe_name(i:int) -> str:
+    return f"Benchmark recipe {i}"
+
+
+database = Database()
+dba = database.db_actions
+
+# Ignore failures from previous runs having already added these
+dba.add_location(LOCATION)
+dba.add_dry_storage(STORAGE, LOCATION)
+for i in range(INGREDIENTS):
+    dba.add_food_type(ingredient_name(i), "g")
+    if i % 2 == 0:
+        dba.add_item_to_inventory(ingredient_name(i), STORAGE, quantity=500.0)
+
+for i in range(RECIPES):
+    ingredients = [(ingredient_name((i * 7 + j * 13) % INGREDIENTS), 50.0 + j * 25) for j in range(INGREDIENTS_PER_RECIPE)]
+    dba.add_recipe(recipe_name(i), ingredients)
+
+# Spread the meals over the year around today, half of them in the past
+print(f"Scheduling {MEALS} meals...")
+first = dt.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - dt.timedelta(days=DAYS // 2)
+for i in range(MEALS):
+    timestamp = first + dt.timedelta(days=DAYS) * i / MEALS
+    result = dba.dynamic_query(
+        "MealSchedule",
+        "Schedule a meal",
+        recipe_name=recipe_name(i % RECIPES),
+        timestamp=timestamp,
+        meal_type="Benchmark"
+    )
+    if not result.is_success():
+        print(f"Could not schedule a meal: {result.get_error_message()}")
+        sys.exit(1)
+
+for name, length in RANGES.items():
+    for include_forecast in (False, True):
+        times = []
+        for _ in range(RUNS):
+            now = dt.datetime.now()
+            began = time.perf_counter()
+            result = dba.gen_shopping_list(start=now, end=now + length, include_forecast=include_forecast)
+            times.append((time.perf_counter() - began) * 1000)
+
+            if not result.is_success():
+                print(f"Could not generate the shopping list: {result.get_error_message()}")
+                sys.exit(1)
+
+        forecast = "with forecast" if include_forecast else "meals only"
+        print(f"{name}, {forecast}: {len(result.get_data_list())} items, median {statistics.median(times):.1f} ms, min {min(times):.1f} ms over {RUNS} runs")
+
+database.close()
@@ -0,0 +1,58 @@
+"""
+Benchmarks how long the user interface takes to load at startup, without
+connecting to the database.
+
+Each measurement runs in a fresh interpreter so that nothing is already
+imported or cached. The startup of the view package as it is now, with
+the compiled forms of COMPILE_UI.py and popups that load when first opened,
+is compared with parsing main.ui and every popup .ui file up front.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 10
+
+SETUP = """
+import os, sys, time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+start = time.perf_counter()
+"""
+
+STARTUP = {
+    "Compiled forms, lazy popups": """
+import view
+from view import util
+window = util.load_ui("main.ui")
+""",
+    "Parsed forms, every popup up front": """
+import glob
+from PyQt6 import uic
+import view
+from view import util
+window = uic.loadUi(util.get_ui_path("main.ui"))
+for path in glob.glob(util.get_ui_path("popup", "*.ui")):
+    uic.loadUiType(path)
+""",
+}
+
+def measure(code:str) -> float:
+    """
+    Runs the code in a fresh interpreter and gets how many milliseconds it took.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", SETUP + code + "print((time.perf_counter() - start) * 1000)"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+for name, code in STARTUP.items():
+    times = [measure(code) for _ in range(RUNS)]
+    print(f"{name}: median {statistics.median(times):.1f} ms, min {min(times):.1f} ms over {RUNS} runs")
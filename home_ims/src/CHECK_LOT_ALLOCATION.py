@@ -0,0 +1,73 @@
+"""
+Checks that consuming items allocates quantities across their lots without
+leaving the lots with rounding errors, and exits with a non-zero status if
+any case fails, so that it can be run as a check in CI.
+
+Lot quantities are stored in `FLOAT` columns, so each case uses the exact
+values the database returns for them, and what is left in each lot is
+worked out the same way "Take from lots" does.
+This does not need a database to run.
+"""
+import struct
+import sys
+
+from Database import _allocate_lots
+
+def as_stored(quantity:float) -> float:
+    """
+    Rounds a quantity to what a `FLOAT` column stores for it.
+    """
+    return struct.unpack("f", struct.pack("f", quantity))[0]
+
+
+# The name, the item id and quantity of each lot in order, the quantity to
+# consume of each item, what should be left in each lot and what should still
+# be needed of each item
+CASES = [
+    ("Use up a lot exactly", [(1, 0.3)], {1: 0.3}, [0.0], {1: 0.0}),
+    ("Use up several lots exactly", [(1, 0.1), (1, 0.2)], {1: 0.3}, [0.0, 0.0], {1: 0.0}),
+    ("Use up many small lots exactly", [(1, 0.1)] * 3, {1: 0.3}, [0.0, 0.0, 0.0], {1: 0.0}),
+    ("Use up lots that add up to less than asked", [(1, 0.7), (1, 0.3)], {1: 1.0}, [0.0, 0.0], {1: 0.0}),
+    ("Take part of a lot", [(1, 0.3)], {1: 0.1}, [0.2], {1: 0.0}),
+    ("Take part of the last lot", [(1, 0.1), (1, 0.3)], {1: 0.3}, [0.0, 0.1], {1: 0.0}),
+    ("Ask for more than there is", [(1, 0.1), (1, 0.2)], {1: 0.4}, [0.0, 0.0], {1: 0.1}),
+    (
+        "Use up the lots of several items",
+        [(1, 0.1), (1, 0.2), (2, 0.3), (2, 0.3), (3, 0.6)],
+        {1: 0.3, 2: 0.4, 3: 0.1},
+        [0.0, 0.0, 0.0, 0.2, 0.5],
+        {1: 0.0, 2: 0.0, 3: 0.0}
+    ),
+]
+
+failed = 0
+for name, lot_quantities, needed, expected_left, expected_needed in CASES:
+    lots = [
+        {"item_id": item_id, "storage_id": 1, "timestamp": i, "quantity": as_stored(q)}
+        for i, (item_id, q) in enumerate(lot_quantities)
+    ]
+    needed = dict(needed)
+    taken = {lot["timestamp"]: lot["taken"] for lot in _allocate_lots(lots, needed)}
+
+    # SET I.quantity = GREATEST(I.quantity - L.taken, 0), stored back as a FLOAT
+    left = [as_stored(max(lot["quantity"] - taken.get(str(lot["timestamp"]), 0), 0)) for lot in lots]
+
+    problems = []
+    for i, (actual, expected) in enumerate(zip(left, expected_left)):
+        if expected == 0 and actual != 0:
+            problems.append(f"lot {i} was left with {actual!r} instead of being used up")
+        elif abs(actual - expected) > 1e-6:
+            problems.append(f"lot {i} was left with {actual!r} instead of {expected!r}")
+
+    for item_id, expected in expected_needed.items():
+        if abs(needed[item_id] - expected) > 1e-6:
+            problems.append(f"{needed[item_id]!r} of item {item_id} is still needed instead of {expected!r}")
+
+    if problems:
+        failed += 1
+        print(f"FAIL {name}: {'; '.join(problems)}")
+    else:
+        print(f"PASS {name}")
+
+print(f"{len(CASES) - failed} of {len(CASES)} cases passed")
+sys.exit(1 if failed else 0)
@@ -0,0 +1,18 @@
+"""
+Checks that every query that declares an expected index in sql_statements.json
+is planned with that index, and exits with a non-zero status if any is not,
+so that it can be run as a check in CI.
+"""
+import sys
+
+from Database import Database
+
+mydb = Database(auto_connect=False)
+if not mydb.connect() or not mydb.build_database():
+    print("Could not set up the database to check the query plans against.")
+    sys.exit(2)
+
+all_passed = mydb.check_query_plans()
+mydb.close()
+
+sys.exit(0 if all_passed else 1)
@@ -0,0 +1,45 @@
+"""
+Compiles every Qt Designer .ui file of the views into a Python module so
+that the app does not have to parse their XML every time it starts.
+
+The modules are written to view/ui_compiled, mirroring the layout of view/ui,
+and are used by `view.util.load_ui_type()` for as long as they are at least
+as new as their .ui file. Run this again after changing any .ui file.
+"""
+import os
+import xml.etree.ElementTree as ElementTree
+from PyQt6 import uic
+
+# The same directories as `view.util`, which is not imported as the view needs the database config
+view_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "view")
+ui_root = os.path.join(view_root, "ui")
+compiled_root = os.path.join(view_root, "ui_compiled")
+
+for directory, _, files in os.walk(ui_root):
+    relative = os.path.relpath(directory, ui_root)
+    output_directory = os.path.normpath(os.path.join(compiled_root, relative))
+    os.makedirs(output_directory, exist_ok=True)
+
+    # Make every directory of the compiled modules a package
+    for package in {compiled_root, output_directory}:
+        open(os.path.join(package, "__init__.py"), "a").close()
+
+    for file in sorted(files):
+        if not file.endswith(".ui"):
+            continue
+
+        ui_path = os.path.join(directory, file)
+        module_path = os.path.join(output_directory, file.removesuffix(".ui") + ".py")
+
+        top_widget = ElementTree.parse(ui_path).getroot().find("widget")
+        if top_widget is None:
+            raise ValueError(f"{ui_path} does not have a top level widget.")
+
+        with open(module_path, "w") as module:
+            uic.compileUi(ui_path, module)
+
+            # The form and base classes, as uic.loadUiType() would give them
+            module.write(f"\nFORM_CLASS = Ui_{top_widget.get('name')}\n")
+            module.write(f"BASE_CLASS = QtWidgets.{top_widget.get('class')}\n")
+
+        print(f"Compiled {os.path.relpath(ui_path, view_root)}")
@@ -1,9 +1,12 @@
 # -- Library Imports --
 from mysql.connector import Error, IntegrityError, InterfaceError, MySQLConnection
 from mysql.connector.cursor import MySQLCursorDict
+from concurrent.futures import Future
 from types import FunctionType, MethodType
+from typing import TYPE_CHECKING
 import datetime as dt
 import inspect
+import json
 import warnings
 
 
@@ -12,6 +15,76 @@ from env import MARIADB_HOST, MARIADB_PORT, MARIADB_USER
 from secrets import MARIADB_PASSWORD # (ignore error, it's caused by .gitignore file and is expected.)
 from sql_statements import SQL_Statements
 from action_result import ActionResult
+import forecast
+from recipe_index import RecipeIndex
+from search_index import TrigramIndex
+from query_filter import QueryFilter
+from pagination import Keyset, SortColumn
+
+if TYPE_CHECKING:
+    from connection_pool import ConnectionPool
+
+
+def _add_months(month:dt.date, months:int) -> dt.date:
+    """
+    Moves the first day of a month forwards (or backwards) by a number of months.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return dt.date(index // 12, index % 12 + 1, 1)
+
+
+# The relative difference between a quantity stored in a FLOAT column and the next
+FLOAT_EPSILON = 2 ** -23
+
+
+def _allocate_lots(lots:list[dict], needed:dict[int, float]) -> list[dict]:
+    """
+    Allocates the quantities needed of each item across its lots, in the
+    order the lots are given.
+
+    Stored quantities are rounded, so a lot is used up whenever what is left
+    to take of its item is within the rounding error of its quantity.
+    This way lots are never left with a rounding error that is too small to
+    be removed, or taken below zero.
+
+    Parameters
+    ----------
+    `lots` : list[dict]
+        The `item_id`, `storage_id`, `timestamp` and exact `quantity` of
+        each lot.
+
+    `needed` : dict[int, float]
+        The quantity needed of each item by its id.
+        Updated with what could not be taken from the lots.
+
+    Returns
+    -------
+    list[dict]
+        The `item_id`, `storage_id`, `timestamp` and quantity `taken` from
+        each lot that is taken from.
+    """
+    taken_lots = []
+    allocated:dict[int, float] = {}
+    for lot in lots:
+        item_id = lot["item_id"]
+        remaining = needed.get(item_id, 0)
+        if remaining <= 0:
+            continue
+
+        lot_quantity = float(lot["quantity"])
+        tolerance = FLOAT_EPSILON * (allocated.get(item_id, 0) + lot_quantity)
+        if remaining >= lot_quantity - tolerance:
+            taken = lot_quantity
+            needed[item_id] = 0 if remaining - lot_quantity <= tolerance else remaining - lot_quantity
+        else:
+            taken = remaining
+            needed[item_id] = 0
+
+        allocated[item_id] = allocated.get(item_id, 0) + taken
+        taken_lots.append({"item_id": item_id, "storage_id": lot["storage_id"], "timestamp": str(lot["timestamp"]), "taken": taken})
+
+    return taken_lots
+
 
 
 class Database:
@@ -59,6 +132,13 @@ class Database:
         to use.
     """
 
+    # Tables partitioned by month on their timestamp column
+    PARTITIONED_TABLES = ("History", "Purchase")
+
+    # Number of months of individual history and purchase records to keep
+    RETENTION_MONTHS = 24
+
+
     def __init__(self,
                  db_host:str=MARIADB_HOST,
                  db_port:int=MARIADB_PORT,
@@ -272,6 +352,10 @@ class Database:
                     else:
                         print(f"Success: {function_name}") # TODO Implement proper logging using the logging library
 
+            # Bring the schema up to date
+            if operation_successful:
+                operation_successful = self.migrate_database()
+
         else:
             operation_successful = False
             print(f"Connection failed, database {self.db_name} not created.")
@@ -287,6 +371,307 @@ class Database:
         return operation_successful
 
 
+    def get_schema_version(self) -> int:
+        """
+        Gets the version of the latest migration applied to the database.
+
+        Returns
+        -------
+        int
+            The schema version of the database.
+            0 if no migrations have been applied yet.
+        """
+        statement = self.__sql_statements.get_query(group="SchemaVersion", name="Select schema version")
+        self.__cursor.execute(statement)
+        row = self.__cursor.fetchone()
+
+        return int(row["version"]) if type(row) is dict else 0
+
+
+    def is_schema_current(self) -> bool:
+        """
+        Checks whether the database exists and has every migration applied,
+        so that `build_database()` would have nothing to do.
+
+        Assumptions
+        -----------
+        - The database connection is open.
+        - The database connection cursor is open.
+
+        Returns
+        -------
+        bool
+            Whether the database is at the latest schema version.
+            False if the database or its `SchemaVersion` table does not exist yet.
+        """
+        try:
+            return self.get_schema_version() == self.__sql_statements.get_latest_schema_version()
+        except Error:
+            return False
+
+
+    def migrate_database(self) -> bool:
+        """
+        Applies every migration newer than the current schema version of the
+        database, in order.
+        The schema version is recorded after each version has been fully applied
+        so an interrupted migration will resume from the first version that did
+        not complete.
+
+        Migrations are DDL statements, which MySQL cannot roll back, so a failed
+        migration stops all further migrations and leaves the database at the
+        last version that did complete.
+        A migration fails on an error or on any warning above the level of a
+        note, as notes are expected from statements such as `DROP TABLE IF EXISTS`.
+
+        Assumptions
+        -----------
+        - The database connection is open.
+        - The database connection cursor is open.
+        - The `SchemaVersion` table exists.
+
+        Returns
+        -------
+        bool
+            Whether the database is now at the latest schema version.
+        """
+        if not self.__connection.is_connected() or self.__cursor is None:
+            print(f"Connection failed, database {self.db_name} not migrated.")
+            return False
+
+        current_version = self.get_schema_version()
+        latest_version = self.__sql_statements.get_latest_schema_version()
+
+        # Group the pending migrations by the version they bring the database up to
+        pending:dict[int, list[dict]] = {}
+        for migration in self.__sql_statements.get_migration_sql_functions():
+            if migration["version"] > current_version:
+                pending.setdefault(migration["version"], []).append(migration)
+
+        for version, migrations in pending.items():
+            for migration in migrations:
+                # Notes, such as of a table to drop that does not exist, are expected
+                # and are not failures. Any other warning is.
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    try:
+                        self.__cursor.execute(migration["query"])
+                        failures = [w for w in self.__cursor.warnings or [] if w[0] != "Note"]
+                    except Error as e:
+                        failures = [str(e)]
+
+                if failures:
+                    print(f"An error occurred whilst migrating to version {version} ({migration['function']}). Not executing further migrations.")
+                    print(str(failures[0]))
+                    return False
+                else:
+                    print(f"Success: {migration['function']}")
+
+            # Record the version once all of its migrations have been applied
+            statement = self.__sql_statements.get_query(group="SchemaVersion", name="Add schema version")
+            self.__cursor.execute(statement, (version,))
+            print(f"Database migrated to version {version}")
+
+        return self.get_schema_version() == latest_version
+
+
+    def check_query_plans(self) -> bool:
+        """
+        Runs `EXPLAIN` on every query in the json file that declares the index it
+        is expected to use and checks that the optimizer chooses that index for
+        the query, as the `key` of one of the tables of the plan.
+
+        An index that is only among the `possible_keys` does not pass, as the
+        query would still be run without it. Run the checks against a database
+        with realistic data, such as the demo database, as the optimizer may
+        prefer a full scan of a nearly empty table.
+
+        Assumptions
+        -----------
+        - The database connection is open.
+        - The database connection cursor is open.
+        - The database is at the latest schema version.
+
+        Returns
+        -------
+        bool
+            Whether every checked query uses its expected index.
+        """
+        all_passed = True
+
+        for check in self.__sql_statements.get_explain_checks():
+            name = f"{check['group']} / {check['function']}"
+
+            try:
+                self.__cursor.execute(f"EXPLAIN {check['query']}", check["inputs"])
+                plan = self.__cursor.fetchall()
+            except Error as e:
+                print(f"Failed: {name} could not be explained.")
+                print(str(e))
+                all_passed = False
+                continue
+
+            chosen_keys = {str(row["key"]) for row in plan if row.get("key")}
+
+            if check["index"] in chosen_keys:
+                print(f"Success: {name} uses {check['index']}")
+            else:
+                print(f"Failed: {name} does not use {check['index']} (uses: {', '.join(sorted(chosen_keys)) or 'no index'})")
+                all_passed = False
+
+        return all_passed
+
+
+    def maintain_partitions(self, months_ahead:int=3) -> bool:
+        """
+        Splits monthly partitions off of the catch all `p_future` partition of each
+        table in `PARTITIONED_TABLES` so that every month from the last existing
+        monthly partition (or the earliest record if there are none yet) up to
+        `months_ahead` months from now has a partition of its own.
+
+        Parameters
+        ----------
+        `months_ahead` : int
+            The number of months after the current month to create partitions for.
+
+        Assumptions
+        -----------
+        - The database connection is open.
+        - The database connection cursor is open.
+        - The database is at the latest schema version.
+
+        Returns
+        -------
+        bool
+            Whether every table was successfully partitioned.
+        """
+        if not self.__connection.is_connected() or self.__cursor is None:
+            print(f"Connection failed, partitions of database {self.db_name} not maintained.")
+            return False
+
+        last_month = _add_months(dt.date.today().replace(day=1), months_ahead)
+
+        for table in self.PARTITIONED_TABLES:
+            months = self._partition_months(table)
+
+            if months:
+                month = _add_months(months[-1], 1)
+            else:
+                # Start from the month of the earliest record so that no records are left in p_future
+                statement = self.__sql_statements.get_query(group="Partitions", name="Select earliest record")
+                self.__cursor.execute(statement.format(table=table))
+                earliest = self.__cursor.fetchone()["earliest"] # ignore error
+                month = (earliest.date() if earliest is not None else dt.date.today()).replace(day=1)
+
+            partitions = []
+            while month <= last_month:
+                partitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{_add_months(month, 1):%Y-%m-%d}')")
+                month = _add_months(month, 1)
+
+            if not partitions:
+                continue
+
+            statement = self.__sql_statements.get_query(group="Partitions", name="Split future partition")
+            try:
+                self.__cursor.execute(statement.format(table=table, partitions=", ".join(partitions)))
+            except Error as e:
+                print(f"An error occurred whilst partitioning {table}.")
+                print(str(e))
+                return False
+            else:
+                print(f"Success: Added {len(partitions)} partitions to {table}")
+
+        return True
+
+
+    def apply_retention(self, months_to_keep:int=RETENTION_MONTHS) -> bool:
+        """
+        Rolls every monthly partition of the tables in `PARTITIONED_TABLES` that is
+        older than `months_to_keep` months up into the matching summary table
+        (`HistorySummary` or `PurchaseSummary`) and then drops the partition.
+
+        The summary of a month is replaced rather than added to, so if dropping a
+        partition fails the next run will summarise it again without counting any
+        records twice.
+
+        Parameters
+        ----------
+        `months_to_keep` : int
+            The number of months before the current month to keep individual
+            records for.
+
+        Assumptions
+        -----------
+        - The database connection is open.
+        - The database connection cursor is open.
+        - The database is at the latest schema version.
+
+        Returns
+        -------
+        bool
+            Whether every expired partition was summarised and dropped.
+        """
+        if not self.__connection.is_connected() or self.__cursor is None:
+            print(f"Connection failed, retention not applied to database {self.db_name}.")
+            return False
+
+        cutoff = _add_months(dt.date.today().replace(day=1), -months_to_keep)
+
+        for table in self.PARTITIONED_TABLES:
+            for month in self._partition_months(table):
+                if month >= cutoff:
+                    break
+
+                try:
+                    self.start_transaction()
+
+                    statement = self.__sql_statements.get_query(group=f"{table}Summary", name=f"Delete {table.lower()} summary month")
+                    self.__cursor.execute(statement, (month,))
+
+                    statement = self.__sql_statements.get_query(group=f"{table}Summary", name=f"Summarise {table.lower()} month")
+                    self.__cursor.execute(statement, (month, month, _add_months(month, 1)))
+
+                    self.commit()
+
+                    statement = self.__sql_statements.get_query(group="Partitions", name="Drop partition")
+                    self.__cursor.execute(statement.format(table=table, partition=f"p{month:%Y%m}"))
+                except Error as e:
+                    self.rollback()
+                    print(f"An error occurred whilst applying retention to {table} for {month:%Y-%m}.")
+                    print(str(e))
+                    return False
+                else:
+                    print(f"Success: Summarised and dropped {table} records for {month:%Y-%m}")
+
+        return True
+
+
+    def _partition_months(self, table:str) -> list[dt.date]:
+        """
+        Gets the months covered by the monthly partitions of a table.
+
+        Parameters
+        ----------
+        `table` : str
+            The name of the partitioned table.
+
+        Returns
+        -------
+        list[dt.date]
+            The first day of each month that has a partition, in order.
+        """
+        statement = self.__sql_statements.get_query(group="Partitions", name="Select partitions")
+        self.__cursor.execute(statement, (table,))
+
+        months = []
+        for row in self.__cursor.fetchall():
+            name = str(row["partition_name"]) # ignore error
+            if name.startswith("p") and name[1:].isdigit():
+                months.append(dt.date(int(name[1:5]), int(name[5:7]), 1))
+
+        return months
+
+
     def build_demo_database(self) -> None:
         """
         THIS IS A DESTRUCTIVE OPERATION!
@@ -436,6 +821,63 @@ class Database:
         the sql statements exists and are correct.
         """
 
+        # The query each name search index is built from
+        SEARCH_INDEX_QUERIES = {
+            "items": ("ItemType", "Select item type names"),
+            "storages": ("Storage", "Select storage names"),
+            "recipes": ("Recipe", "Select recipe names"),
+        }
+
+        # Queries run through `dynamic_query()` and the in-memory indexes they make out of date
+        INDEX_INVALIDATING_QUERIES = {
+            ("ItemType", "Add item type"): ("items",),
+            ("Storage", "Add storage"): ("storages",),
+            ("Storage", "Delete storage"): ("storages",),
+            ("Template", "Delete template"): ("ingredients", "recipes"),
+            ("Recipe", "Create recipe"): ("ingredients", "recipes"),
+            ("Recipe", "Delete recipe"): ("ingredients", "recipes"),
+            ("Ingredients", "Add ingredient"): ("ingredients",),
+            ("Ingredients", "Remove ingredient"): ("ingredients",),
+        }
+
+        # Prefixes of the names of actions that only read from the database
+        READ_ACTION_PREFIXES = ("select_", "view_", "search_", "get_", "gen_", "prefetch")
+
+        # The sort key the inventory is paginated by, ending with a key of the table
+        INVENTORY_KEYSET = Keyset(
+            SortColumn("I.expiry", "expiry", nullable=True),
+            SortColumn("T.name", "item_name"),
+            SortColumn("S.storage_name", "storage_name"),
+            SortColumn("I.timestamp", "timestamp"),
+        )
+
+        # The columns history records can be sorted by, which are followed by the
+        # tiebreakers so that every page is seeked by a unique key.
+        # Names are unique, so sorting by a joined name and then the time can be read
+        # in order from the unique index on the name and the (id, timestamp) index of
+        # the records that reference it.
+        # FLOAT columns are seeked by their exact value as a DOUBLE, as the value
+        # the server gives for a FLOAT is rounded and would not match the stored one.
+        HISTORY_SORT_COLUMNS = {
+            "item_name": SortColumn("T.name", "item_name"),
+            "quantity": SortColumn("H.quantity", "quantity_key"),
+            "timestamp": SortColumn("H.timestamp", "timestamp"),
+            "wasted": SortColumn("H.wasted", "wasted"),
+            "user_name": SortColumn("U.name", "user_name", nullable=True),
+        }
+        HISTORY_TIEBREAKERS = (SortColumn("H.timestamp", "timestamp"), SortColumn("H.id", "id"))
+
+        # The columns purchase records can be sorted by, as for `HISTORY_SORT_COLUMNS`
+        PURCHASE_SORT_COLUMNS = {
+            "item_name": SortColumn("T.name", "item_name"),
+            "quantity": SortColumn("P.quantity", "quantity_key"),
+            "timestamp": SortColumn("P.timestamp", "timestamp"),
+            "price": SortColumn("P.price", "price_key"),
+            "store": SortColumn("P.store", "store"),
+            "parent_name": SortColumn("U.name", "parent_name"),
+        }
+        PURCHASE_TIEBREAKERS = (SortColumn("P.timestamp", "timestamp"), SortColumn("P.id", "id"))
+
         def __init__(self, parent):
             """
             Creates a collection of database actions for the `parent` 
@@ -454,6 +896,20 @@ class Database:
             if not type(self.__parent) == Database:
                 raise TypeError("Parent of all DB_Actions instances must be an instance of Database")
 
+            # In-memory indexes, built on first use and cleared whenever what they index changes
+            self.__indexes:dict[str, RecipeIndex|TrigramIndex] = {}
+
+            # Incremented whenever an action may have changed the data, so that
+            # cached results know when they are out of date
+            self.__data_version:int = 0
+
+            # The signatures of the actions, to tell when two calls are the same
+            self.__signatures:dict[str, inspect.Signature] = {}
+
+            # Results of actions started ahead of time on pooled connections,
+            # by call, along with the data version they were started at
+            self.__prefetched:dict[tuple, tuple[int, Future]] = {}
+
 
             def pre_func() -> bool:
                 """
@@ -515,16 +971,26 @@ class Database:
                 # Check that the function exists and is indeed a function
                 if old_func is not None and type(old_func) in (FunctionType, MethodType):
 
+                    # Whether the function may change the data.
+                    # Dynamic queries are checked by the query they run instead.
+                    writes = not name.startswith(self.READ_ACTION_PREFIXES) and name != "dynamic_query"
+
+                    self.__signatures[name] = inspect.signature(old_func)
+
                     # Define the new function with pre and post functions
                     def new_func(*args, **kargs):
-                        result = None
-                        if pre_func():
-                            try:
-                                result = old_func(*args, **kargs)
-                            except Exception as e:
-                                result = ActionResult(error_message="An unknown error occurred", exception=e)
-                        else:
-                            result = ActionResult(error_message="Function pre-conditions were not met. Function aborted.")
+                        # Use the result of the same call if it was already run ahead of time
+                        result = self._take_prefetched(name, args, kargs) if self.__prefetched else None
+                        if result is None:
+                            if pre_func():
+                                try:
+                                    result = old_func(*args, **kargs)
+                                except Exception as e:
+                                    result = ActionResult(error_message="An unknown error occurred", exception=e)
+                                if writes:
+                                    self._data_changed()
+                            else:
+                                result = ActionResult(error_message="Function pre-conditions were not met. Function aborted.")
                         post_func()
 
                         return result
@@ -550,6 +1016,112 @@ class Database:
 
 
 
+        @property
+        def data_version(self) -> int:
+            """
+            A number that changes whenever an action may have changed the data
+            in the database. Results cached while it stays the same are still
+            up to date, as far as this application's own changes go.
+            """
+            return self.__data_version
+
+
+
+
+        def prefetch(self, pool:"ConnectionPool", action:str, *args, **kargs) -> Future:
+            """
+            Starts running a read action on a connection of `pool`, so that the
+            next call of the action with the same arguments gets its result
+            instead of running it again.
+
+            The result is dropped as soon as the data changes, and is not used
+            if the action failed, in which case the action runs as normal.
+
+            Parameters
+            ----------
+            `pool` : ConnectionPool
+                The pool of connections to run the action on.
+
+            `action` : str
+                The name of the action, which must only read from the database.
+
+            `*args`, `**kargs`
+                The arguments of the action.
+
+            Returns
+            -------
+            Future
+                The result of the action once it has run.
+            """
+            future = pool.submit(lambda database: getattr(database.db_actions, action)(*args, **kargs))
+            self.__prefetched[self._call_key(action, args, kargs)] = (self.__data_version, future)
+            return future
+
+
+
+        def _clear_prefetched(self) -> None:
+            """
+            Drops the results of every prefetched call that has not been used,
+            cancelling the ones that have not started running yet.
+            """
+            for _, future in self.__prefetched.values():
+                future.cancel()
+            self.__prefetched.clear()
+
+
+
+        def _data_changed(self) -> None:
+            """
+            Records that the data has changed, so that results read before
+            the change, such as prefetched ones, are no longer used.
+            """
+            self.__data_version += 1
+            self._clear_prefetched()
+
+
+
+        def _call_key(self, action:str, args:tuple, kargs:dict) -> tuple:
+            """
+            Gets a key that is the same for every call of an action with the same
+            arguments, whether they are given by position, by keyword or left
+            to their defaults.
+            """
+            arguments = self.__signatures[action].bind(*args, **kargs)
+            arguments.apply_defaults()
+            return (action, repr(tuple(arguments.arguments.items())))
+
+
+
+        def _take_prefetched(self, action:str, args:tuple, kargs:dict) -> ActionResult|None:
+            """
+            Gets the result of a prefetched call of an action, waiting for it to
+            finish if it is still running.
+
+            Returns
+            -------
+            ActionResult | None
+                The result, or `None` if the call was not prefetched or its
+                result cannot be used.
+            """
+            try:
+                key = self._call_key(action, args, kargs)
+            except TypeError:
+                return None
+
+            version, future = self.__prefetched.pop(key, (None, None))
+            if future is None or version != self.__data_version:
+                return None
+
+            try:
+                result = future.result()
+            except Exception:
+                return None
+
+            return result if isinstance(result, ActionResult) and result.is_success() else None
+
+
+
+
         # ----- DYNAMIC -----
 
         def dynamic_query(self, group:str, function_name:str, **kargs) -> ActionResult:
@@ -622,6 +1194,10 @@ class Database:
             cursor:MySQLCursorDict = self.__parent._Database__cursor
             cursor.execute(query, inputs)
 
+            self._invalidate_indexes(*self.INDEX_INVALIDATING_QUERIES.get((group, function_name), ()))
+            if len(expected_outputs) == 0:
+                self._data_changed()
+
 
             # -- Get outputs --
             if len(expected_outputs) > 0:
@@ -632,6 +1208,183 @@ class Database:
 
 
 
+        # ----- PAGINATION -----
+
+        def _select_page(self,
+                         group:str,
+                         function_name:str,
+                         query_filter:QueryFilter,
+                         keyset:Keyset,
+                         after:str|None=None,
+                         limit:int|None=None,
+                         until:str|None=None
+                         ) -> ActionResult:
+            """
+            Selects a page of rows of a query with `{where}`, `{order}` and
+            `{limit}` placeholders, using seek based pagination.
+
+            Parameters
+            ----------
+            `group` : str
+                The group of the query.
+
+            `function_name` : str
+                The name of the query.
+
+            `query_filter` : QueryFilter
+                The filters of the rows.
+
+            `keyset` : Keyset
+                The sort key of the rows.
+
+            `after` : str | None
+                The cursor of the page to select, as given by the previous page.
+                `None` for the first page.
+
+            `limit` : int | None
+                The maximum number of rows in the page.
+                `None` to select every row after the cursor.
+
+            `until` : str | None
+                The cursor of the last row to select, to select the rows of a
+                page that was selected before again, along with any rows that
+                have been added among them since.
+                `None` for no last row.
+
+            Returns
+            -------
+            ActionResult
+                The rows of the page, along with the cursor of the next page
+                if there are more rows after it.
+            """
+            cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+            if after is not None:
+                keyset.seek(query_filter, after)
+            if until is not None:
+                keyset.until(query_filter, until)
+
+            statement = self.__parent._Database__sql_statements.get_query(group=group, name=function_name)
+            statement = query_filter.format(statement, order=keyset.order_by(), limit=keyset.limit(limit))
+            cursor.execute(statement, query_filter.params())
+            rows = cursor.fetchall()
+
+            # The query selects one extra row to tell whether there is a next page
+            next_cursor = None
+            if limit is not None and len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = keyset.cursor(rows[-1]) # ignore error
+
+            return ActionResult(data=rows, next_cursor=next_cursor)
+
+
+
+
+        # ----- SEARCH -----
+
+        def _invalidate_indexes(self, *names:str) -> None:
+            """
+            Clears in-memory indexes so that they are rebuilt the next
+            time they are used.
+
+            Parameters
+            ----------
+            `*names` : str
+                The names of the indexes to clear.
+                `"ingredients"` for the recipe ingredient index or one of
+                the keys of `SEARCH_INDEX_QUERIES` for a name search index.
+            """
+            for name in names:
+                self.__indexes.pop(name, None)
+
+
+
+        def _share_indexes(self, other:"Database.DB_Actions") -> None:
+            """
+            Uses the in-memory indexes of `other` instead of building separate ones,
+            so that they are cleared along with the ones of `other`.
+            """
+            self.__indexes = other.__indexes
+
+
+
+        def _search_names(self, index_name:str, text:str, fuzzy:bool=True, limit:int|None=None) -> ActionResult:
+            """
+            Searches names with one of the name search indexes, building it
+            first if needed.
+
+            Parameters
+            ----------
+            `index_name` : str
+                The key of the index in `SEARCH_INDEX_QUERIES`.
+
+            `text` : str
+                The text to search for.
+
+            `fuzzy` : bool
+                Whether to include typo tolerant matches.
+
+            `limit` : int | None
+                The maximum number of results to return.
+                `None` for no limit.
+            """
+            if index_name not in self.__indexes:
+                cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+                group, function_name = self.SEARCH_INDEX_QUERIES[index_name]
+                statement = self.__parent._Database__sql_statements.get_query(group=group, name=function_name)
+                cursor.execute(statement)
+                self.__indexes[index_name] = TrigramIndex(row["name"] for row in cursor.fetchall()) # ignore error
+
+            return ActionResult(data=self.__indexes[index_name].search(text, fuzzy=fuzzy, limit=limit)) # ignore error
+
+
+
+        def search_item_names(self, text:str, fuzzy:bool=True, limit:int|None=None) -> ActionResult:
+            """
+            Searches item type names by prefix, substring and, if `fuzzy`,
+            typo tolerant matches using an in-memory trigram index.
+
+            Parameters
+            ----------
+            `text` : str
+                The text to search for.
+
+            `fuzzy` : bool
+                Whether to include typo tolerant matches.
+
+            `limit` : int | None
+                The maximum number of results to return.
+                `None` for no limit.
+
+
+            Returns
+            -------
+            ActionResult
+                The data is a list of the matching names with the `name`,
+                how it `matched` and its `similarity` to `text`, best first.
+            """
+            return self._search_names("items", text, fuzzy, limit)
+
+
+
+        def search_storage_names(self, text:str, fuzzy:bool=True, limit:int|None=None) -> ActionResult:
+            """
+            Searches storage names the same way as `search_item_names()`.
+            """
+            return self._search_names("storages", text, fuzzy, limit)
+
+
+
+        def search_recipe_names(self, text:str, fuzzy:bool=True, limit:int|None=None) -> ActionResult:
+            """
+            Searches recipe names the same way as `search_item_names()`.
+            """
+            return self._search_names("recipes", text, fuzzy, limit)
+
+
+
+
         # ----- ITEM TYPE -----
 
         def _add_item_type(self, name:str, unit:str) -> ActionResult:
@@ -666,6 +1419,7 @@ class Database:
             except Exception as e:
                 return ActionResult(error_message="Failed to add item type", exception=e)
             else:
+                self._invalidate_indexes("items")
                 return ActionResult()
 
 
@@ -1371,6 +2125,7 @@ class Database:
             """
             Removes a location record to the database.
             The location must not be used by anywhere else in the database.
+            The on hand totals of the location are removed along with it.
 
             Parameters
             ----------
@@ -1462,6 +2217,7 @@ class Database:
             except Exception as e:
                 return ActionResult(error_message="Failed to create storage", exception=e)
             else:
+                self._invalidate_indexes("storages")
                 return ActionResult()
 
 
@@ -1531,6 +2287,7 @@ class Database:
                 return ActionResult(success=False, warnings=warnings)
             else:
                 connection.commit()
+                self._invalidate_indexes("storages")
                 return ActionResult(success=True)
 
 
@@ -2668,7 +3425,8 @@ class Database:
                 data = (item_name, storage_name, expiry, quantity)
                 cursor.execute(statement, data)
             except IntegrityError as e:
-                if "FOREIGN" in str(e) and "storage_name" in str(e):
+                # Storage names are resolved to ids in the query so a missing storage leaves the id NULL
+                if "storage_id" in str(e):
                     return ActionResult(error_message="Storage location does not exist", exception=e)
                 else:
                     return ActionResult(error_message="Item already exists in inventory", exception=e)
@@ -2720,18 +3478,24 @@ class Database:
                                  storage_name:str="",
                                  expiry_from:dt.datetime|None=None,
                                  expiry_to:dt.datetime|None=None,
-                                 include_non_perishable:bool=True
+                                 include_non_perishable:bool=True,
+                                 added_since:dt.datetime|None=None,
+                                 after:str|None=None,
+                                 limit:int|None=None
                                  ) -> ActionResult:
             """
-            Selects all the items that match the search parameters.
+            Selects the items that match the search parameters, soonest to expire first.
 
             Parameters
             ----------
             `item_name` : str
                 The name of the `item` to search for.
+                Matches names starting with or containing it as well as
+                names it is likely a typo of.
 
             `storage_name` : str
                 The name of the storage location the `item` is stored in.
+                Matches names starting with or containing it.
 
             `expiry_from` : datetime | None
                 The lower bound datetime of when the item will expire.
@@ -2743,26 +3507,44 @@ class Database:
 
             `include_non_perishable` : bool
                 Whether to include items that don't have an expiry date.
-            """
-            cursor:MySQLCursorDict = self.__parent._Database__cursor
 
-            # TODO This should be its own function and be applied to all LIKE clauses.
-            # Escape characters
-            item_name = item_name.replace("!", "!!").replace("%", "!%")
-            storage_name = storage_name.replace("!", "!!").replace("%", "!%")
+            `added_since` : datetime | None
+                Only include items added at or after this time, to select what
+                changed since the items were last selected.
+                Use `None` to include items no matter when they were added.
 
-            item_name = f"%{item_name}%"
-            storage_name = f"%{storage_name}%"
+            `after` : str | None
+                The cursor of the page to select, as given by the previous page.
+                `None` for the first page.
 
-            # Set min and max values for the expiry range
-            if expiry_from is None: expiry_from = dt.datetime.min
-            if expiry_to is None: expiry_to = dt.datetime.max
+            `limit` : int | None
+                The maximum number of items in the page.
+                `None` for every item.
+            """
+            # Resolve the search text to the matching names with the search indexes
+            # so the database can look them up by index instead of scanning with LIKE.
+            # Filters that are left blank are not sent to the database at all.
+            item_names = None
+            if item_name.strip():
+                matches = self.search_item_names(item_name)
+                if not matches.is_success():
+                    return matches
+                item_names = [m["name"] for m in matches.get_data_list()]
 
-            statement = self.__parent._Database__sql_statements.get_query(group = "Inventory", name = "View inventory items")
-            data = (item_name, storage_name, expiry_from, expiry_to, include_non_perishable)
-            cursor.execute(statement, data)
+            storage_names = None
+            if storage_name.strip():
+                matches = self.search_storage_names(storage_name, fuzzy=False)
+                if not matches.is_success():
+                    return matches
+                storage_names = [m["name"] for m in matches.get_data_list()]
 
-            return ActionResult(data=cursor.fetchall())
+            query_filter = (QueryFilter()
+                            .in_values("T.name", item_names)
+                            .in_values("S.storage_name", storage_names)
+                            .range("I.expiry", expiry_from, expiry_to, include_null=include_non_perishable)
+                            .range("I.timestamp", added_since))
+
+            return self._select_page("Inventory", "View inventory items", query_filter, self.INVENTORY_KEYSET, after, limit)
 
 
 
@@ -2917,6 +3699,78 @@ class Database:
 
 
 
+        def consume_item(self,
+                         item_name:str,
+                         quantity:float,
+                         user:str,
+                         location_name:str="%"
+                         ) -> ActionResult:
+            """
+            Consumes a quantity of an item from however many lots of it
+            are needed, taking from the first expiring lot first.
+            Lots without an expiry are taken from last.
+
+            All of the lots are updated with a single statement and used up
+            lots are removed with another, then the whole quantity is
+            logged as a single history record, all in one transaction.
+
+            Parameters
+            ----------
+            `item_name` : str
+                The name of the `item`.
+
+            `quantity` : float
+                The quantity of the item to consume.
+
+            `user` : str
+                The name of the user who used the item.
+
+            `location_name` : str
+                The name of the location to consume the `item` from.
+                Uses SQL style regex, defaults to every location.
+            """
+            cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+            if quantity <= 0:
+                return ActionResult(error_message="Quantity to consume must be greater than 0")
+
+            self.__parent.start_transaction()
+
+            try:
+                statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Select lots of item")
+                data = (item_name, location_name)
+                cursor.execute(statement, data)
+
+                # Allocate the quantity across the lots in order
+                found = cursor.fetchall()
+                item_id = found[0]["item_id"] if found else None # ignore error
+                needed = {item_id: quantity}
+                lots = _allocate_lots(found, needed) # ignore error
+
+                if needed[item_id] > 0:
+                    self.__parent.rollback()
+                    return ActionResult(error_message="Cannot consume more than present in inventory")
+
+                statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Take from lots")
+                cursor.execute(statement, (json.dumps(lots),))
+
+                statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Remove empty lots")
+                cursor.execute(statement, (json.dumps([lots[0]["item_id"]]),))
+
+                statement = self.__parent._Database__sql_statements.get_query(group="Used", name="Add item used record")
+                cursor.execute(statement, (item_name, quantity, user))
+
+                statement = self.__parent._Database__sql_statements.get_query(group="UsageRollup", name="Add used to rollup")
+                cursor.execute(statement, (item_name, quantity))
+            except Exception as e:
+                self.__parent.rollback()
+                return ActionResult(error_message="Failed to consume item", exception=e)
+
+            self.__parent.commit()
+            return ActionResult(success=True)
+
+
+
         def _remove_and_log_inventory(self,
                                       item_name:str,
                                       storage_name:str,
@@ -2926,11 +3780,13 @@ class Database:
                                       ) -> ActionResult:
             """
             Removes an item from the inventory and logs it.
+            This is done in a single call to the `RemoveAndLogInventory`
+            stored procedure.
 
-            If the desired quantity to remove is move than what 
-            is currently left in inventory then the quantity
-            remaining will be what is logged and the inventory 
-            record will be removed.
+            If the desired quantity to remove is more than what 
+            is currently left in inventory then nothing is removed.
+            The inventory record is removed once its quantity
+            reaches zero.
 
             Parameters
             ----------
@@ -2953,59 +3809,18 @@ class Database:
             """
             cursor:MySQLCursorDict = self.__parent._Database__cursor
 
-            # Start a database transaction
-            self.__parent.start_transaction()
-
-            # Calculate the new quantity of the item
-            new_quantity:float
+            # The procedure only decrements the item if enough of it is left, so two users
+            # removing the same item at once cannot overwrite each other's changes.
             try:
-                stmt1 = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Select item quantity from inventory")
-                data1 = (item_name, storage_name, timestamp)
-                cursor.execute(stmt1, data1)
-                value = cursor.fetchone()
-                if type(value) is dict:
-                    # This handles weird RowItemType conversions because MySQL has no good documentation
-                    old_quantity = str(value["quantity"]) 
-                    new_quantity = float(old_quantity) - quantity_removed
-                else:
-                    raise ValueError("The quantity of the item could not be collected because the item does not exist in inventory");
-            except Exception as e:
-                self.__parent.rollback()
-                return ActionResult(error_message="Failed to get inventory quantity", exception=e)
-
-            if new_quantity < 0:
-                self.__parent.rollback()
-                return ActionResult(error_message="Cannot remove more than present in inventory")
-
-            # Reduce the quantity of the item by the desired amount or remove the item if its quantity has been exhausted.
-            result:ActionResult
-            if new_quantity > 0:
-                result = self._change_item_quantity(new_quantity, item_name, storage_name, timestamp)
-            else:
-                result = self._remove_item_from_inventory(item_name, storage_name, timestamp)
-
-            # Rollback and return if the change quantity operation was not successful
-            if not result.is_success():
-                self.__parent.rollback()
-                return result
-
-            # Log the usage of the item
-            try:
-                if user is None:
-                    stmt = self.__parent._Database__sql_statements.get_query(group="Wasted", name="Add item wasted record")
-                    data = (item_name, quantity_removed)
-                    cursor.execute(stmt, data)
-                else:
-                    stmt = self.__parent._Database__sql_statements.get_query(group="Used", name="Add item used record")
-                    data = (item_name, quantity_removed, user)
-                    cursor.execute(stmt, data)
-            except Exception as e:
-                self.__parent.rollback()
-                return ActionResult(error_message="Failed to log usage of item", exception=e)
-
+                statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Remove and log item")
+                data = (item_name, storage_name, timestamp, quantity_removed, user)
+                cursor.execute(statement, data)
+            except Error as e:
+                # Errors signalled by the procedure carry a message meant for the user
+                if e.sqlstate == "45000":
+                    return ActionResult(error_message=e.msg, exception=e)
+                return ActionResult(error_message="Failed to remove item from inventory", exception=e)
 
-            # If all went well, commit the changes
-            self.__parent.commit()
             return ActionResult(success=True)
 
 
@@ -3052,10 +3867,102 @@ class Database:
                 return ActionResult(error_message="Failed to create recipe", exception=e)
 
             self.__parent.commit()
+            self._invalidate_indexes("ingredients", "recipes")
             return ActionResult(success=True)
 
         
 
+        def _get_recipe_index(self) -> RecipeIndex:
+            """
+            Gets the recipe index, building it from the database if it
+            has not been built since recipes last changed.
+            """
+            if "ingredients" not in self.__indexes:
+                cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+                statement = self.__parent._Database__sql_statements.get_query(group="Recipe", name="Select recipe ingredient names")
+                cursor.execute(statement)
+                self.__indexes["ingredients"] = RecipeIndex(cursor.fetchall()) # ignore error
+
+            return self.__indexes["ingredients"] # ignore error
+
+
+
+        def search_recipes(self,
+                           all_of:list[str]=[],
+                           any_of:list[str]=[],
+                           none_of:list[str]=[]
+                           ) -> ActionResult:
+            """
+            Searches recipes by several ingredients at once using an
+            in-memory index of the ingredients of every recipe.
+
+            Parameters
+            ----------
+            `all_of` : list[str]
+                Names of foods the recipes must all use.
+
+            `any_of` : list[str]
+                Names of foods the recipes must use at least one of.
+
+            `none_of` : list[str]
+                Names of foods the recipes must not use.
+
+
+            Returns
+            -------
+            ActionResult
+                The data is a list of the matching recipes with their
+                `recipe_name`, the number of searched foods `matched` and
+                the `coverage` of their ingredients by the searched foods,
+                ranked by coverage.
+            """
+            try:
+                return ActionResult(data=self._get_recipe_index().search(all_of, any_of, none_of)) # ignore error
+            except Exception as e:
+                return ActionResult(error_message="Failed to search recipes", exception=e)
+
+
+
+        def select_recipe_feasibility(self, recipe_name:str="%") -> ActionResult:
+            """
+            Checks every recipe against the quantity of each of its
+            ingredients on hand, in a single query.
+
+            Parameters
+            ----------
+            `recipe_name` : str
+                The name of the recipes to check.
+                Uses SQL style regex with `!` as the escape character.
+
+
+            Returns
+            -------
+            ActionResult
+                The data is a list with an entry for each recipe containing
+                the `recipe_name`, whether it `can_cook` with the current
+                stock and a list of the `missing` ingredients, each with
+                its `food_name`, `unit` and the `quantity` missing.
+            """
+            cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+            try:
+                statement = self.__parent._Database__sql_statements.get_query(group="Recipe", name="Select recipe feasibility")
+                cursor.execute(statement, (recipe_name,))
+
+                recipes:dict[str, dict] = {}
+                for row in cursor.fetchall():
+                    recipe = recipes.setdefault(row["recipe_name"], {"recipe_name": row["recipe_name"], "can_cook": True, "missing": []}) # ignore error
+                    if row["food_name"] is not None: # ignore error
+                        recipe["can_cook"] = False
+                        recipe["missing"].append({"food_name": row["food_name"], "unit": row["unit"], "quantity": row["quantity"]}) # ignore error
+
+                return ActionResult(data=list(recipes.values()))
+            except Exception as e:
+                return ActionResult(error_message="Failed to check recipe feasibility", exception=e)
+
+
+
         def search_recipes_by_ingredient(self, ingredient:str="") -> ActionResult:
             """
             Gets a list of recipes that include the provide ingredient.
@@ -3079,91 +3986,238 @@ class Database:
 
 
 
-        def gen_shopping_list(self, timestamp:dt.datetime=dt.datetime.now() + dt.timedelta(days=7)) -> ActionResult:
+        def get_on_hand_quantity(self, item_name:str, location_name:str|None=None) -> ActionResult:
+            """
+            Gets the total quantity of an item in inventory.
+            The totals are kept up to date by triggers on the `Inventory`
+            table so this does not need to sum the inventory records.
+
+            Parameters
+            ----------
+            `item_name` : str
+                The name of the `item`.
+
+            `location_name` : str | None
+                The name of the location to total the `item` at.
+                `None` to total the `item` across every location.
+
+
+            Returns
+            -------
+            ActionResult
+                The data is the quantity on hand as a float.
+            """
+            cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+            try:
+                if location_name is None:
+                    statement = self.__parent._Database__sql_statements.get_query(group="OnHand", name="Select item on hand")
+                    data = (item_name,)
+                else:
+                    statement = self.__parent._Database__sql_statements.get_query(group="OnHand", name="Select item on hand at location")
+                    data = (item_name, location_name)
+
+                cursor.execute(statement, data)
+                value = cursor.fetchone()
+                return ActionResult(data=float(str(value["quantity"])) if type(value) is dict else 0.0)
+            except Exception as e:
+                return ActionResult(error_message="Failed to get quantity on hand", exception=e)
+
+
+
+        def gen_shopping_list(self,
+                              start:dt.datetime=dt.datetime.min,
+                              end:dt.datetime|None=None,
+                              location_name:str="%",
+                              include_forecast:bool=True
+                              ) -> ActionResult:
             """
             Generates a Shopping list from the items that will be needed 
-            for planned meals within the period from now until the provided
-            `timestamp` and that there currently is not enough of in inventory.
+            for planned meals within the period from `start` until `end`
+            and that there currently is not enough of in inventory.
+
+            Items that are expected to run out before `end` at the rate they
+            have recently been used are added to the list as well, so that
+            everyday consumables appear without being part of a meal.
+            If an item is both needed for meals and expected to run out, the
+            larger of the two missing quantities is used.
 
             Parameters
             ----------
-            `timestamp` : datetime
+            `start` : datetime
+                The lower bound timestamp for meals to gather out of stock items
+                for to populate the shopping list out of.
+                Defaults to the earliest possible time so that meals which are
+                still scheduled in the past are included.
+
+            `end` : datetime | None
                 The upper bound timestamp for meals to gather out of stock items 
                 for to populate the shopping list out of.
-                Defaults to now plus seven days.
+                Defaults to seven days from now.
+
+            `location_name` : str
+                The name of the location whose inventory counts as stock.
+                Uses SQL style regex, defaults to every location.
+
+            `include_forecast` : bool
+                Whether to add the items forecast to run out before `end`.
             """
             cursor:MySQLCursorDict = self.__parent._Database__cursor
 
+            now = dt.datetime.now()
+            if end is None:
+                end = now + dt.timedelta(days=7)
+
             try:
                 statement = self.__parent._Database__sql_statements.get_query(group="Shopping List", name="Select missing ingredients")
-                data = (timestamp, timestamp)
+                data = (start, end, location_name)
                 cursor.execute(statement, data)
-                return ActionResult(data=cursor.fetchall())
+                shopping_list = {row["food_name"]: row for row in cursor.fetchall()} # ignore error
+
+                if include_forecast:
+                    statement = self.__parent._Database__sql_statements.get_query(group="UsageRollup", name="Select consumption since")
+                    data = (location_name, now.date() - dt.timedelta(days=forecast.LOOKBACK_DAYS))
+                    cursor.execute(statement, data)
+
+                    horizon_days = (end - now).total_seconds() / 86400
+                    for row in forecast.forecast_shortfalls(cursor.fetchall(), now.date(), horizon_days): # ignore error
+                        scheduled = shopping_list.get(row["food_name"])
+                        if scheduled is None or float(str(scheduled["quantity"])) < row["quantity"]:
+                            shopping_list[row["food_name"]] = row
+
+                return ActionResult(data=list(shopping_list.values()))
             except Exception as e:
                 return ActionResult(error_message="Failed to generate shopping list", exception=e)
 
 
 
+        def select_meals(self,
+                         recipe_name:str|None=None,
+                         timestamp_from:dt.datetime|None=None,
+                         timestamp_to:dt.datetime|None=None,
+                         meal_type:str|None=None
+                         ) -> ActionResult:
+            """
+            Selects scheduled meals, latest first.
+            Only the filters that are given are applied.
+
+            Parameters
+            ----------
+            `recipe_name` : str | None
+                The name of the recipe of the meals.
+
+            `timestamp_from` : datetime | None
+                The earliest time the meals are scheduled for.
+
+            `timestamp_to` : datetime | None
+                The latest time the meals are scheduled for.
+
+            `meal_type` : str | None
+                The type of the meals.
+            """
+            cursor:MySQLCursorDict = self.__parent._Database__cursor
+
+            query_filter = (QueryFilter()
+                            .equals("T.name", recipe_name)
+                            .range("M.timestamp", timestamp_from, timestamp_to)
+                            .equals("M.meal_type", meal_type))
+
+            statement = self.__parent._Database__sql_statements.get_query(group="MealSchedule", name="Select meals")
+            cursor.execute(query_filter.format(statement), query_filter.params())
+
+            return ActionResult(data=cursor.fetchall())
+
+
+
         def consume_meal(self, recipe_name:str, timestamp:dt.datetime, user:str) -> ActionResult:
+            """
+            Alias for `consume_meals()` with a single meal.
+            """
+            return self.consume_meals([(recipe_name, timestamp)], user)
+
+
+
+        def consume_meals(self, meals:list[tuple[str, dt.datetime]], user:str) -> ActionResult:
+            """
+            Consumes a list of scheduled meals, using up the ingredients
+            they need from inventory and removing them from the schedule.
+
+            The ingredients of every meal are totalled and then allocated
+            across the lots of each ingredient at once, taking from the first
+            expiring lot first, so the number of statements run does not
+            depend on the number of meals, ingredients or lots.
+            Everything is done in a single transaction.
+
+            If there is not enough of an ingredient in inventory then all of
+            it is used, only the quantity that was actually used is logged,
+            and a warning is returned with how much was missing.
+
+            Parameters
+            ----------
+            `meals` : list[tuple[str, datetime]]
+                The scheduled meals to consume.
+                Each meal is a tuple of the name of its recipe and the
+                timestamp it is scheduled for.
+
+            `user` : str
+                The name of the user who ate the meals.
+            """
             cursor:MySQLCursorDict = self.__parent._Database__cursor
 
+            meals_json = json.dumps([{"recipe_name": recipe_name, "timestamp": str(timestamp)} for recipe_name, timestamp in set(meals)])
+
             self.__parent.start_transaction()
 
             try:
-                # Get recipe ingredients.
-                stmt_ingredients = self.__parent._Database__sql_statements.get_query(group="Ingredients", name="View ingredients for a recipe")
-                data_ingredients = (recipe_name,)
-                cursor.execute(stmt_ingredients, data_ingredients)
-                ingredients = {}
+                # Total the ingredients needed across every meal
+                statement = self.__parent._Database__sql_statements.get_query(group="MealSchedule", name="Select ingredients of meals")
+                cursor.execute(statement, (meals_json,))
+                ingredients = {i["item_id"]: i for i in cursor.fetchall()} # ignore error
+                needed = {item_id: float(str(i["quantity"])) for item_id, i in ingredients.items()}
+
+                # Allocate the needed quantities across the lots of each ingredient in order
+                lots = []
+                if ingredients:
+                    statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Select lots of items")
+                    cursor.execute(statement, (json.dumps(list(ingredients)),))
+                    lots = _allocate_lots(cursor.fetchall(), needed) # ignore error
+
+                if lots:
+                    statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Take from lots")
+                    cursor.execute(statement, (json.dumps(lots),))
+
+                    statement = self.__parent._Database__sql_statements.get_query(group="Inventory", name="Remove empty lots")
+                    cursor.execute(statement, (json.dumps(list(ingredients)),))
+
+                # Log what was actually used of each ingredient
                 use_log = []
-
-                # Collect ingredients into dictionary.
-                for i in cursor.fetchall():
-                    use_log.append((i["food_name"], i["quantity"], user))
-                    ingredients[i["food_name"]] = i["quantity"]
-                
-                # Get available inventory.
-                stmt_inventory = self.__parent._Database__sql_statements.get_query(group="Ingredients", name="Search inventory by ingredients")
-                data_inventory = (recipe_name,)
-                cursor.execute(stmt_inventory, data_inventory)
-
-                # Track inventory to remove and update.
-                remove_log = []
-                update_log = []
-
-                for i in cursor.fetchall():
-                    quantity = ingredients.get(i["item_name"])
-                    if quantity is None:
-                        continue
-
-                    new_quantity = i["quantity"] - quantity
-                    if new_quantity <= 0:
-                        remove_log.append((i["item_name"], i["storage_name"], i["timestamp"]))
-                    else:
-                        update_log.append((new_quantity, i["item_name"], i["storage_name"], i["timestamp"]))
-                    
-                    if new_quantity >= 0:
-                        del ingredients[i["item_name"]]
-
-                stmt_remove = self.__parent._Database__sql_statements.get_query(group = "Inventory", name = "Remove item from inventory")
-                cursor.executemany(stmt_remove, remove_log)
-                
-                stmt_update = self.__parent._Database__sql_statements.get_query(group = "Inventory", name = "Change item quantity")
-                cursor.executemany(stmt_update, update_log)
-
-                stmt_use = stmt = self.__parent._Database__sql_statements.get_query(group="Used", name="Add item used record")
-                cursor.executemany(stmt_use, use_log)
-
-                stmt_consume = self.__parent._Database__sql_statements.get_query(group="MealSchedule", name="Delete a meal")
-                data_consume = (recipe_name, timestamp)
-                cursor.execute(stmt_consume, data_consume)
+                missing = []
+                for item_id, i in ingredients.items():
+                    used = float(str(i["quantity"])) - needed[item_id]
+                    if used > 0:
+                        use_log.append((i["food_name"], used))
+                    if needed[item_id] > 0:
+                        missing.append(f"Missing {needed[item_id]:g} of {i['food_name']}")
+
+                if use_log:
+                    statement = self.__parent._Database__sql_statements.get_query(group="Used", name="Add item used record")
+                    cursor.executemany(statement, [(name, used, user) for name, used in use_log])
+
+                    statement = self.__parent._Database__sql_statements.get_query(group="UsageRollup", name="Add used to rollup")
+                    cursor.executemany(statement, use_log)
+
+                statement = self.__parent._Database__sql_statements.get_query(group="MealSchedule", name="Delete meals")
+                cursor.execute(statement, (meals_json,))
+                if cursor.rowcount != len(set(meals)):
+                    self.__parent.rollback()
+                    return ActionResult(error_message="Some of the meals are not scheduled")
             except Exception as e:
                 self.__parent.rollback()
-                return ActionResult(error_message="", exception=e)
+                return ActionResult(error_message="Failed to consume meals", exception=e)
 
             self.__parent.commit()
 
-            return ActionResult(success=True)
+            return ActionResult(success=True, warnings=missing)
 
         # ----- PURCHASE -----
 
@@ -3219,6 +4273,9 @@ class Database:
                 statement = self.__parent._Database__sql_statements.get_query(group="Purchase", name="Add purchase record")
                 data = (item_name, quantity, price, store, parent_name)
                 cursor.execute(statement, data)
+
+                statement = self.__parent._Database__sql_statements.get_query(group="UsageRollup", name="Add spent to rollup")
+                cursor.execute(statement, (item_name, price))
             except Exception as e:
                 self.__parent.rollback()
                 return ActionResult(error_message="Failed to add purchase record", exception=e)
@@ -3235,3 +4292,137 @@ class Database:
             return ActionResult(success=True)
 
 
+
+        def select_purchases(self,
+                             item_name:str|None=None,
+                             timestamp_from:dt.datetime|None=None,
+                             timestamp_to:dt.datetime|None=None,
+                             store:str|None=None,
+                             parent_name:str|None=None,
+                             sort_by:str="timestamp",
+                             descending:bool=True,
+                             after:str|None=None,
+                             limit:int|None=None,
+                             until:str|None=None
+                             ) -> ActionResult:
+            """
+            Selects purchase records, latest first by default.
+            Only the filters that are given are applied.
+
+            Parameters
+            ----------
+            `item_name` : str | None
+                The name of the item that was purchased.
+
+            `timestamp_from` : datetime | None
+                The earliest time of the purchases.
+
+            `timestamp_to` : datetime | None
+                The latest time of the purchases.
+
+            `store` : str | None
+                The name of the store the items were bought at.
+
+            `parent_name` : str | None
+                The name of the parent who bought the items.
+
+            `sort_by` : str
+                The column to sort by, one of the keys of `PURCHASE_SORT_COLUMNS`.
+                Records with the same value are sorted by when they were made.
+
+            `descending` : bool
+                Whether to sort in descending order.
+
+            `after` : str | None
+                The cursor of the page to select, as given by the previous page.
+                `None` for the first page.
+
+            `limit` : int | None
+                The maximum number of records in the page.
+                `None` for every record.
+
+            `until` : str | None
+                The cursor of the last record to select. The next cursor of a
+                page selects that page again, along with any records added among it since.
+                `None` for no last record.
+            """
+            query_filter = (QueryFilter()
+                            .equals("T.name", item_name)
+                            .range("P.timestamp", timestamp_from, timestamp_to)
+                            .equals("P.store", store)
+                            .equals("U.name", parent_name))
+
+            if sort_by not in self.PURCHASE_SORT_COLUMNS:
+                return ActionResult(error_message=f"Purchases cannot be sorted by {sort_by}.")
+
+            keyset = Keyset.sorted_by(self.PURCHASE_SORT_COLUMNS[sort_by], descending, *self.PURCHASE_TIEBREAKERS)
+
+            return self._select_page("Purchase", "Select purchases", query_filter, keyset, after, limit, until)
+
+        # ----- HISTORY -----
+
+        def select_history_records(self,
+                                   item_name:str|None=None,
+                                   timestamp_from:dt.datetime|None=None,
+                                   timestamp_to:dt.datetime|None=None,
+                                   wasted:bool|None=None,
+                                   user_name:str|None=None,
+                                   sort_by:str="timestamp",
+                                   descending:bool=True,
+                                   after:str|None=None,
+                                   limit:int|None=None,
+                                   until:str|None=None
+                                   ) -> ActionResult:
+            """
+            Selects history records of items being used or wasted, latest first by default.
+            Only the filters that are given are applied.
+
+            Parameters
+            ----------
+            `item_name` : str | None
+                The name of the item that was used or wasted.
+
+            `timestamp_from` : datetime | None
+                The earliest time of the records.
+
+            `timestamp_to` : datetime | None
+                The latest time of the records.
+
+            `wasted` : bool | None
+                `True` for only wasted items, `False` for only used items.
+
+            `user_name` : str | None
+                The name of the user who used the items.
+
+            `sort_by` : str
+                The column to sort by, one of the keys of `HISTORY_SORT_COLUMNS`.
+                Records with the same value are sorted by when they were made.
+
+            `descending` : bool
+                Whether to sort in descending order.
+
+            `after` : str | None
+                The cursor of the page to select, as given by the previous page.
+                `None` for the first page.
+
+            `limit` : int | None
+                The maximum number of records in the page.
+                `None` for every record.
+
+            `until` : str | None
+                The cursor of the last record to select. The next cursor of a
+                page selects that page again, along with any records added among it since.
+                `None` for no last record.
+            """
+            query_filter = (QueryFilter()
+                            .equals("T.name", item_name)
+                            .range("H.timestamp", timestamp_from, timestamp_to)
+                            .equals("H.wasted", wasted)
+                            .equals("U.name", user_name))
+
+            if sort_by not in self.HISTORY_SORT_COLUMNS:
+                return ActionResult(error_message=f"History records cannot be sorted by {sort_by}.")
+
+            keyset = Keyset.sorted_by(self.HISTORY_SORT_COLUMNS[sort_by], descending, *self.HISTORY_TIEBREAKERS)
+
+            return self._select_page("History", "Select history records", query_filter, keyset, after, limit, until)
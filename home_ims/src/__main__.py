@@ -2,18 +2,21 @@ from PyQt6 import QtWidgets
 import sys
 
 from Database import *
+from startup import Startup
 import view
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
 
-    db = Database(auto_connect=False)
-    if db.connect():
-        # Build the database if it doesn't exist
-        db.build_database()
+    startup = Startup(Database(auto_connect=False))
+    if startup.connect():
+        # Read what the first screen needs in parallel while the window is shown
+        startup.warm_up(view.INITIAL_READS)
 
-        dba = db.db_actions
-        view.show_window(dba)
+        view.show_window(startup.dba, on_loaded=startup.loaded, pool=startup.pool)
+        startup.timeline.record("Window shown", startup.timeline.now())
         app.exec()
+
+        startup.close()
     else:
-        print("Could not connect to database. Exiting.")
+        print("Could not connect to or set up the database. Exiting.")
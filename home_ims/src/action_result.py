@@ -12,7 +12,8 @@ class ActionResult:
                  Any] | None]|str|None=None,
                  error_message:str|None=None,
                  exception:Exception|None=None,
-                 warnings:list|None=None
+                 warnings:list|None=None,
+                 next_cursor:str|None=None
                  ) -> None:
         self.error_occurred:bool = not error_message is None or not exception is None
         self.success:bool = success and not self.error_occurred
@@ -36,6 +37,9 @@ class ActionResult:
 
         self.exception:Exception|None = exception
 
+        # The cursor of the next page of the data, if there is one
+        self.next_cursor:str|None = next_cursor
+
 
 
     def get_data(self) -> list[dict[str,Any]|None]|str|None:
@@ -63,3 +67,9 @@ class ActionResult:
 
     def get_warnings(self) -> list|None:
         return self.warnings
+
+    def get_next_cursor(self) -> str|None:
+        return self.next_cursor
+
+    def has_next_page(self) -> bool:
+        return self.next_cursor is not None
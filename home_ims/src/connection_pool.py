@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from Database import Database
+
+
+class ConnectionPool:
+    """
+    Runs work on a fixed number of background threads, each with its own
+    connection to the database, so that queries can run in parallel with each
+    other and with the user interface.
+
+    A connection can only run one query at a time, so every thread gets its
+    own `Database`, connected the first time the thread needs it. They all
+    share the in-memory search indexes of `database`, which are cleared
+    whenever its actions change what they index.
+    """
+
+    def __init__(self, database:Database, size:int=3):
+        """
+        Parameters
+        ----------
+        `database` : Database
+            The database to connect to, with the same settings.
+
+        `size` : int
+            The number of threads and connections.
+        """
+        self.__database = database
+        self.__executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="ConnectionPool")
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__databases:list[Database] = []
+
+
+    def __get_database(self) -> Database:
+        """
+        Gets the database of the current thread, connecting it if needed.
+        """
+        database = getattr(self.__local, "database", None)
+        if database is None:
+            database = Database(
+                db_host=self.__database.db_host,
+                db_port=self.__database.db_port,
+                db_user=self.__database.db_user,
+                db_password=self.__database.db_password
+            )
+            database.db_actions._share_indexes(self.__database.db_actions)
+            self.__local.database = database
+            with self.__lock:
+                self.__databases.append(database)
+
+        return database
+
+
+    def submit(self, work:Callable[[Database], Any]) -> Future:
+        """
+        Runs `work(database)` on a pooled connection.
+
+        Returns
+        -------
+        Future
+            What `work` returns once it has run.
+        """
+        return self.__executor.submit(lambda: work(self.__get_database()))
+
+
+    def close(self) -> None:
+        """
+        Waits for the work that was submitted to finish and closes every connection.
+        """
+        self.__executor.shutdown(wait=True)
+        with self.__lock:
+            for database in self.__databases:
+                database.close()
+            self.__databases.clear()
@@ -0,0 +1,75 @@
+import datetime as dt
+import numpy as np
+
+# Number of days of usage history to base consumption rates on
+LOOKBACK_DAYS = 90
+
+# Number of days after which a day of usage counts for half as much towards the rate
+HALF_LIFE_DAYS = 14.0
+
+
+def forecast_shortfalls(usage:list[dict],
+                        today:dt.date,
+                        horizon_days:float,
+                        half_life_days:float=HALF_LIFE_DAYS
+                        ) -> list[dict]:
+    """
+    Projects which items will run out within the horizon based on how quickly
+    they have been used or wasted recently.
+
+    The consumption rate of every item is computed at once as an exponentially
+    weighted mean of its daily consumption, from the first day the item was
+    consumed within the lookback window up to `today`. Days without any
+    consumption count as zero so that occasional use gives a low rate.
+
+    Parameters
+    ----------
+    `usage` : list[dict]
+        The rows of the "Select consumption since" query.
+        Each row has an `item_name`, `unit`, `day`, the quantity `consumed`
+        that day and the quantity currently `on_hand`.
+
+    `today` : date
+        The day the forecast is made on.
+
+    `horizon_days` : float
+        The number of days from `today` to project consumption over.
+
+    `half_life_days` : float
+        The age in days at which a day of usage has half the weight of today.
+
+    Returns
+    -------
+    list[dict]
+        A row for each item expected to run out within the horizon with the
+        `food_name`, `unit` and the `quantity` that will be missing, in the same
+        format as the rows of the shopping list.
+    """
+    if not usage or horizon_days <= 0:
+        return []
+
+    names, item_index = np.unique([str(row["item_name"]) for row in usage], return_inverse=True)
+    ages = np.maximum([(today - row["day"]).days for row in usage], 0).astype(float)
+    consumed = np.array([float(str(row["consumed"])) for row in usage])
+
+    units = np.empty(len(names), dtype=object)
+    units[item_index] = [row["unit"] for row in usage]
+    on_hand = np.zeros(len(names))
+    on_hand[item_index] = [float(str(row["on_hand"])) for row in usage]
+
+    # Weighted sum of the consumption of each item
+    ratio = 0.5 ** (1 / half_life_days)
+    weighted_consumed = np.bincount(item_index, weights=consumed * ratio ** ages, minlength=len(names))
+
+    # Sum of the weights of every day since each item was first consumed (geometric series)
+    first_age = np.zeros(len(names))
+    np.maximum.at(first_age, item_index, ages)
+    total_weight = (1 - ratio ** (first_age + 1)) / (1 - ratio)
+
+    daily_rate = weighted_consumed / total_weight
+    shortfall = daily_rate * horizon_days - on_hand
+
+    return [
+        {"food_name": str(names[i]), "unit": units[i], "quantity": float(shortfall[i])}
+        for i in np.flatnonzero(shortfall > 0)
+    ]
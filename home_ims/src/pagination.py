@@ -0,0 +1,197 @@
+import base64
+import datetime as dt
+import json
+from typing import Any, NamedTuple
+
+from query_filter import QueryFilter
+
+
+class SortColumn(NamedTuple):
+    """
+    A column of a sort key.
+
+    `expression` is the column as it is written in the query and `name` is the
+    name it has in the rows the query returns. `nullable` columns sort their
+    `NULL` values after every other value, in either direction.
+    """
+    expression:str
+    name:str
+    descending:bool = False
+    nullable:bool = False
+
+
+def encode_cursor(values:tuple) -> str:
+    """
+    Encodes the sort key values of a row into an opaque cursor token.
+    """
+    def encode(value):
+        if isinstance(value, dt.datetime):
+            return {"datetime": value.isoformat()}
+        if isinstance(value, dt.date):
+            return {"date": value.isoformat()}
+        return value
+
+    data = json.dumps([encode(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(token:str) -> tuple:
+    """
+    Decodes a cursor token made by `encode_cursor()` back into its sort key values.
+
+    Raises
+    ------
+    ValueError
+        If the token is not a valid cursor.
+    """
+    def decode(value):
+        if isinstance(value, dict):
+            if "datetime" in value:
+                return dt.datetime.fromisoformat(value["datetime"])
+            if "date" in value:
+                return dt.date.fromisoformat(value["date"])
+        return value
+
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor {token!r}.") from e
+
+    if not isinstance(data, list):
+        raise ValueError(f"Invalid cursor {token!r}.")
+
+    return tuple(decode(value) for value in data)
+
+
+class Keyset:
+    """
+    A sort key for seek based (keyset) pagination.
+
+    Instead of skipping rows with `OFFSET`, which still reads every skipped row,
+    the next page starts right after the sort key of the last row of the previous
+    page, so every page costs the same no matter how deep into the results it is.
+    The sort key must be unique for every row, so it should end with a key of
+    the table.
+
+    The query paginated with it has `{where}`, `{order}` and `{limit}` placeholders.
+    """
+
+    def __init__(self, *columns:SortColumn):
+        self.columns:tuple[SortColumn, ...] = columns
+
+
+    @classmethod
+    def sorted_by(cls, column:SortColumn, descending:bool, *tiebreakers:SortColumn) -> "Keyset":
+        """
+        Builds a sort key that sorts by `column` and then by the `tiebreakers`,
+        all in the same direction so that a single index on them can be read
+        either forwards or backwards to produce the order.
+
+        Parameters
+        ----------
+        `column` : SortColumn
+            The column to sort by.
+
+        `descending` : bool
+            Whether to sort in descending order.
+
+        `*tiebreakers` : SortColumn
+            The columns that order the rows with the same value of `column`,
+            ending with a key of the table.
+        """
+        columns = [column] + [c for c in tiebreakers if c.expression != column.expression]
+        return cls(*(c._replace(descending=descending) for c in columns))
+
+
+    def order_by(self) -> str:
+        """
+        Gets the `ORDER BY` clause of the sort key.
+        """
+        terms = []
+        for column in self.columns:
+            if column.nullable and not column.descending:
+                # NULL sorts first in ascending order unless told otherwise
+                terms.append(f"ISNULL({column.expression})")
+            terms.append(f"{column.expression} DESC" if column.descending else column.expression)
+
+        return f"ORDER BY {', '.join(terms)}"
+
+
+    def limit(self, limit:int|None) -> str:
+        """
+        Gets the `LIMIT` clause for a page of `limit` rows, or an empty string
+        for no limit.
+        One extra row is selected to tell whether there is another page after it.
+        """
+        return "" if limit is None else f"LIMIT {int(limit) + 1}"
+
+
+    def seek(self, query_filter:QueryFilter, cursor:str) -> QueryFilter:
+        """
+        Adds the condition that only rows after the cursor match to a filter.
+
+        The condition is expanded into `(a > x) OR (a = x AND b > y) OR ...`
+        rather than a row comparison so that the optimizer can use an index
+        on the leading columns of the sort key.
+
+        Raises
+        ------
+        ValueError
+            If the cursor is not valid for this sort key.
+        """
+        return query_filter.condition(*self._after(cursor))
+
+
+    def until(self, query_filter:QueryFilter, cursor:str) -> QueryFilter:
+        """
+        Adds the condition that only rows up to and including the cursor match
+        to a filter, so that together with `seek()` only the rows between two
+        cursors match.
+
+        Raises
+        ------
+        ValueError
+            If the cursor is not valid for this sort key.
+        """
+        condition, *params = self._after(cursor)
+        return query_filter.condition(f"NOT {condition}", *params)
+
+
+    def _after(self, cursor:str) -> tuple:
+        """
+        Gets the condition that a row is after the cursor, followed by its parameters.
+        The condition is never `NULL`, so it can be negated.
+        """
+        values = decode_cursor(cursor)
+        if len(values) != len(self.columns):
+            raise ValueError(f"Invalid cursor {cursor!r}.")
+
+        terms = []
+        params = []
+        for i, column in enumerate(self.columns):
+            value = values[i]
+
+            # Nothing sorts after a NULL in a column that sorts NULL last
+            if value is None:
+                continue
+
+            operator = "<" if column.descending else ">"
+            after = f"{column.expression} {operator} %s"
+            if column.nullable:
+                after = f"({after} OR {column.expression} IS NULL)"
+
+            terms.append(" AND ".join([f"{c.expression} <=> %s" for c in self.columns[:i]] + [after]))
+            params.extend(values[:i])
+            params.append(value)
+
+        if not terms:
+            return ("FALSE",)
+
+        return (f"({' OR '.join(f'({term})' for term in terms)})", *params)
+
+
+    def cursor(self, row:dict[str, Any]) -> str:
+        """
+        Gets the cursor token of a row, for the page that starts after it.
+        """
+        return encode_cursor(tuple(row[column.name] for column in self.columns))
@@ -0,0 +1,147 @@
+from typing import Any
+
+
+def escape_like(text:str) -> str:
+    """
+    Escapes the wildcard characters of text for use in a `LIKE` pattern
+    that uses `!` as its escape character.
+    """
+    return text.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+class QueryFilter:
+    """
+    Builds a parameterized `WHERE` clause out of only the conditions that
+    were actually requested.
+
+    Every method skips its condition when its value is `None` (or blank for
+    text) instead of emitting a predicate that matches everything, such as
+    `LIKE '%'` or a range from the minimum to the maximum datetime, so that
+    the optimizer is free to use the indexes of the conditions that remain.
+
+    Column names are inserted into the query as is and must never come from
+    user input. Values are always passed as parameters.
+
+    The query the filter is used with has a `{where}` placeholder which is
+    replaced by `format()`, and the parameters for it are given by `params()`.
+    """
+
+    def __init__(self):
+        self._conditions:list[str] = []
+        self._params:list[Any] = []
+
+
+    def condition(self, condition:str, *params:Any) -> "QueryFilter":
+        """
+        Adds a condition as is along with its parameters.
+        """
+        self._conditions.append(condition)
+        self._params.extend(params)
+        return self
+
+
+    def equals(self, column:str, value:Any|None) -> "QueryFilter":
+        """
+        Adds `column = value`, unless `value` is `None`.
+        """
+        if value is not None:
+            self.condition(f"{column} = %s", value)
+        return self
+
+
+    def like(self, column:str, pattern:str|None) -> "QueryFilter":
+        """
+        Adds `column LIKE pattern` with `!` as the escape character,
+        unless `pattern` is `None`, blank or only matches everything.
+        """
+        if pattern is not None and pattern.strip() and pattern.strip("%") != "":
+            self.condition(f"{column} LIKE %s ESCAPE '!'", pattern)
+        return self
+
+
+    def contains(self, column:str, text:str|None) -> "QueryFilter":
+        """
+        Adds a condition that `column` contains `text`, unless `text` is
+        `None` or blank.
+        """
+        if text is not None and text.strip():
+            self.like(column, f"%{escape_like(text)}%")
+        return self
+
+
+    def in_values(self, column:str, values:list|None) -> "QueryFilter":
+        """
+        Adds `column IN (values)`, unless `values` is `None`.
+        An empty list of values matches nothing.
+        """
+        if values is None:
+            return self
+
+        if len(values) == 0:
+            return self.condition("FALSE")
+
+        return self.condition(f"{column} IN ({', '.join(['%s'] * len(values))})", *values)
+
+
+    def range(self, column:str, low:Any|None=None, high:Any|None=None, include_null:bool|None=None) -> "QueryFilter":
+        """
+        Adds the bounds of a range on `column` that are not `None`.
+
+        Parameters
+        ----------
+        `column` : str
+            The column to bound.
+
+        `low` : Any | None
+            The inclusive lower bound, `None` for no lower bound.
+
+        `high` : Any | None
+            The inclusive upper bound, `None` for no upper bound.
+
+        `include_null` : bool | None
+            Whether rows where `column` is `NULL` also match.
+            If `False`, they are excluded even when there are no bounds, with
+            `column IS NOT NULL`. If `None`, only the bounds are added, which
+            never match `NULL`, so with no bounds nothing is added.
+        """
+        bounds = []
+        params = []
+        if low is not None:
+            bounds.append(f"{column} >= %s")
+            params.append(low)
+        if high is not None:
+            bounds.append(f"{column} <= %s")
+            params.append(high)
+
+        if not bounds:
+            if include_null is False:
+                self.condition(f"{column} IS NOT NULL")
+        elif include_null:
+            self.condition(f"({' AND '.join(bounds)} OR {column} IS NULL)", *params)
+        else:
+            for bound, param in zip(bounds, params):
+                self.condition(bound, param)
+
+        return self
+
+
+    def sql(self) -> str:
+        """
+        Gets the `WHERE` clause, or an empty string if there are no conditions.
+        """
+        return f"WHERE {' AND '.join(self._conditions)}" if self._conditions else ""
+
+
+    def params(self) -> tuple:
+        """
+        Gets the parameters of the conditions in the order they appear.
+        """
+        return tuple(self._params)
+
+
+    def format(self, query:str, **clauses:str) -> str:
+        """
+        Replaces the `{where}` placeholder of a query with the `WHERE` clause,
+        and any other placeholders with the `clauses` of the same name.
+        """
+        return query.format(where=self.sql(), **clauses)
@@ -0,0 +1,105 @@
+from typing import Iterable
+
+
+def normalise_name(name:str) -> str:
+    """
+    Normalises a food name so that searches ignore case and surrounding whitespace.
+    """
+    return name.strip().casefold()
+
+
+class RecipeIndex:
+    """
+    An in-memory inverted index from food names to the recipes that use them.
+
+    The index is built once from every recipe ingredient and answers
+    multi-ingredient searches with set operations instead of querying the
+    database, so it must be rebuilt whenever recipes or their ingredients change.
+    """
+
+    def __init__(self, rows:Iterable[dict]):
+        """
+        Builds the index.
+
+        Parameters
+        ----------
+        `rows` : Iterable[dict]
+            The rows of the "Select recipe ingredient names" query.
+            Each row has a `recipe_name` and a `food_name`, which is `None`
+            for recipes without any ingredients.
+        """
+        self._recipes_by_food:dict[str, set[str]] = {}
+        self._ingredient_counts:dict[str, int] = {}
+
+        for row in rows:
+            recipe = row["recipe_name"]
+            self._ingredient_counts.setdefault(recipe, 0)
+
+            if row["food_name"] is not None:
+                self._recipes_by_food.setdefault(normalise_name(row["food_name"]), set()).add(recipe)
+                self._ingredient_counts[recipe] += 1
+
+
+    def search(self,
+               all_of:Iterable[str]=(),
+               any_of:Iterable[str]=(),
+               none_of:Iterable[str]=()
+               ) -> list[dict]:
+        """
+        Finds the recipes that use every food in `all_of`, at least one food
+        in `any_of` and none of the foods in `none_of`.
+        Any of the lists can be empty to not filter on it.
+
+        Results are ranked by coverage, the fraction of a recipe's ingredients
+        that were searched for in `all_of` or `any_of`, so recipes that need
+        little beyond what was searched for come first.
+
+        Parameters
+        ----------
+        `all_of` : Iterable[str]
+            Names of foods the recipes must all use.
+
+        `any_of` : Iterable[str]
+            Names of foods the recipes must use at least one of.
+
+        `none_of` : Iterable[str]
+            Names of foods the recipes must not use.
+
+        Returns
+        -------
+        list[dict]
+            A row for each matching recipe with the `recipe_name`, the number
+            of searched foods it `matched` and its `coverage`, best first.
+        """
+        all_of = {normalise_name(name) for name in all_of}
+        any_of = {normalise_name(name) for name in any_of}
+        none_of = {normalise_name(name) for name in none_of}
+
+        # Start from the smallest posting list so that every intersection stays small
+        postings = sorted((self._recipes_by_food.get(food, set()) for food in all_of), key=len)
+        if any_of:
+            postings.append(set().union(*(self._recipes_by_food.get(food, set()) for food in any_of)))
+
+        candidates = set(postings[0]) if postings else set(self._ingredient_counts)
+        for posting in postings[1:]:
+            candidates &= posting
+        for food in none_of:
+            candidates -= self._recipes_by_food.get(food, set())
+
+        # Count how many of the searched foods each candidate uses
+        matched = dict.fromkeys(candidates, 0)
+        for food in all_of | any_of:
+            for recipe in self._recipes_by_food.get(food, set()) & candidates:
+                matched[recipe] += 1
+
+        results = [
+            {
+                "recipe_name": recipe,
+                "matched": count,
+                "coverage": count / self._ingredient_counts[recipe] if self._ingredient_counts[recipe] else 0.0
+            }
+            for recipe, count in matched.items()
+        ]
+        results.sort(key=lambda r: (-r["coverage"], -r["matched"], r["recipe_name"]))
+
+        return results
@@ -0,0 +1,115 @@
+from typing import Iterable
+
+# Minimum trigram similarity for a name to count as a typo tolerant match
+FUZZY_THRESHOLD = 0.3
+
+# How well a name matches a search, best first
+PREFIX_MATCH = 0
+SUBSTRING_MATCH = 1
+FUZZY_MATCH = 2
+
+
+def trigrams(text:str) -> set[str]:
+    """
+    Splits text into its set of trigrams.
+    The text is padded so that the start and end of words produce trigrams of their own,
+    which lets short names and the first letters of a search still be matched.
+    """
+    padded = f"  {text.casefold()} "
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    An in-memory trigram index over a list of names for prefix, substring
+    and typo tolerant searches.
+
+    Every name is split into trigrams and each trigram maps to the names that
+    contain it, so a search only has to look at the names sharing trigrams with
+    the search text instead of every name.
+    """
+
+    def __init__(self, names:Iterable[str]):
+        """
+        Builds the index.
+
+        Parameters
+        ----------
+        `names` : Iterable[str]
+            The names to index.
+        """
+        self._names:list[str] = sorted(set(names))
+        self._folded:list[str] = [name.casefold() for name in self._names]
+        self._postings:dict[str, set[int]] = {}
+
+        for i, name in enumerate(self._names):
+            for trigram in trigrams(name):
+                self._postings.setdefault(trigram, set()).add(i)
+
+
+    def search(self, text:str, fuzzy:bool=True, limit:int|None=None) -> list[dict]:
+        """
+        Searches the indexed names.
+
+        Names that start with `text` are ranked first, then names that
+        contain it anywhere, then (if `fuzzy`) names that are similar enough
+        to it to likely be a typo, ranked by their similarity.
+        Matching ignores case.
+
+        Parameters
+        ----------
+        `text` : str
+            The text to search for.
+            An empty search matches every name.
+
+        `fuzzy` : bool
+            Whether to include typo tolerant matches.
+
+        `limit` : int | None
+            The maximum number of results to return.
+            `None` for no limit.
+
+        Returns
+        -------
+        list[dict]
+            A row for each matching name with the `name`, how it `matched`
+            (`PREFIX_MATCH`, `SUBSTRING_MATCH` or `FUZZY_MATCH`) and its
+            trigram `similarity` to the search text, best first.
+        """
+        folded = text.strip().casefold()
+        if not folded:
+            return [{"name": name, "matched": PREFIX_MATCH, "similarity": 1.0} for name in self._names[:limit]]
+
+        query_trigrams = trigrams(folded)
+
+        # Count the trigrams each name shares with the search text
+        shared:dict[int, int] = {}
+        if len(folded) < 3:
+            # Too short to have a whole trigram of its own, so look through every trigram containing it
+            for trigram, posting in self._postings.items():
+                if folded in trigram:
+                    for i in posting:
+                        shared[i] = shared.get(i, 0) + 1
+        for trigram in query_trigrams:
+            for i in self._postings.get(trigram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        results = []
+        for i, count in shared.items():
+            name = self._folded[i]
+            similarity = count / len(query_trigrams | trigrams(name))
+
+            if name.startswith(folded):
+                matched = PREFIX_MATCH
+            elif folded in name:
+                matched = SUBSTRING_MATCH
+            elif fuzzy and similarity >= FUZZY_THRESHOLD:
+                matched = FUZZY_MATCH
+            else:
+                continue
+
+            results.append({"name": self._names[i], "matched": matched, "similarity": min(similarity, 1.0)})
+
+        results.sort(key=lambda r: (r["matched"], -r["similarity"], r["name"]))
+
+        return results[:limit]
@@ -108,6 +108,23 @@ class SQL_Statements:
         output_string += "\n" * 3
 
 
+        # --- Migrations ---
+        output_string += make_title(make_title("Database Migrations"))
+
+        output_string += "\n" * 1
+
+        # Migration queries
+        for function in self._sql_functions["migrations"]:
+            function:dict
+            query:list[str]|str = function["query"]
+
+            output_string += f"-- Version {function['version']}: {function['function']} --\n"
+            output_string += format_query(query)
+            output_string += "\n"
+
+        output_string += "\n" * 3
+
+
         # --- DML/DQL ---
         output_string += make_title(make_title("Database Queries // DML/DQL"))
 
@@ -151,6 +168,9 @@ class SQL_Statements:
         # Sort ddl functions to be the in the order of intended execution
         self._sql_functions["ddl"].sort(key= lambda x: x["order"])
 
+        # Sort migrations by version (stable, so statements of a version keep their file order)
+        self._sql_functions["migrations"].sort(key= lambda x: x["version"])
+
         
 
     def reload(self) -> None:
@@ -193,6 +213,98 @@ class SQL_Statements:
 
 
 
+    def get_migration_sql_functions(self) -> list[dict[str, str|int|list[str]]]:
+        """
+        Gets the migration sql functions from the preloaded json file.
+        The migrations will be returned sorted by the schema version they
+        bring the database up to. Migrations sharing a version are kept in
+        the order they appear in the json file.
+
+        Returns
+        -------
+        list[dict[str, str|int|list[str]]]:
+            The list of migration sql functions.
+        """
+
+        migrations:list[dict] = copy.deepcopy(self._sql_functions["migrations"])
+
+        # Join multiline strings
+        for function in migrations:
+            function:dict
+            query:list[str]|str = function["query"]
+
+            if type(query) is list:
+                function["query"] = " ".join(query)
+
+        return migrations
+
+
+
+    def get_latest_schema_version(self) -> int:
+        """
+        Gets the schema version the database is at once every migration
+        has been applied.
+
+        Returns
+        -------
+        int
+            The highest migration version, or 0 if there are no migrations.
+        """
+        return max((m["version"] for m in self._sql_functions["migrations"]), default=0)
+
+
+
+    def get_explain_checks(self) -> list[dict[str, str|tuple]]:
+        """
+        Gets every dml/dql function that declares the index it is expected
+        to use under its `explain` key.
+
+        Queries with a `{where}` placeholder are checked with the sample `where`
+        clause of their `explain` key, whose inputs are in the order they are listed,
+        along with its sample `order` and `limit` clauses if the query is paginated.
+
+        Returns
+        -------
+        list[dict[str, str|tuple]]
+            A list of dictionaries with the keys:
+            - `group`: The group of the function.
+            - `function`: The name of the function.
+            - `query`: The query of the function.
+            - `inputs`: The sample inputs for the query, ordered as the query expects them.
+            - `index`: The name of the index the query is expected to use.
+        """
+
+        checks = []
+
+        for group, table_functions in self._sql_functions["dml/dql"].items():
+            for name, function in table_functions.items():
+                explain:dict|None = function.get("explain")
+                if explain is None:
+                    continue
+
+                query = self.get_query(group, name)
+                if "where" in explain:
+                    query = query.format(
+                        where=explain["where"],
+                        order=explain.get("order", ""),
+                        limit=explain.get("limit", "")
+                    )
+                    inputs = tuple(explain["inputs"].values())
+                else:
+                    inputs = tuple(explain["inputs"][key] for key in function["inputs"])
+
+                checks.append({
+                    "group": group,
+                    "function": name,
+                    "query": query,
+                    "inputs": inputs,
+                    "index": explain["index"]
+                })
+
+        return checks
+
+
+
     def get_dmldql_sql_functions(self) -> dict[str, dict[str, dict[str, str|int|list[str]|list[int]]]]:
         """
         Gets the dml/dql sql functions from the preloaded json file.
@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any
+
+from Database import Database
+from connection_pool import ConnectionPool
+
+
+class StartupTimeline:
+    """
+    When each step of startup started and finished, in milliseconds since
+    the timeline was created.
+    Steps can be recorded from any thread.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps:list[tuple[str, float, float|None]] = []
+        self.__lock = threading.Lock()
+
+
+    def now(self) -> float:
+        """
+        Gets the number of milliseconds since the timeline was created.
+        """
+        return (time.perf_counter() - self.start) * 1000
+
+
+    def record(self, name:str, started:float, finished:float|None=None) -> None:
+        """
+        Records a step, or an instant if it has no `finished` time.
+        """
+        with self.__lock:
+            self.steps.append((name, started, finished))
+
+
+    @contextmanager
+    def step(self, name:str):
+        """
+        Records the step that runs inside the `with` block.
+        """
+        started = self.now()
+        try:
+            yield
+        finally:
+            self.record(name, started, self.now())
+
+
+    def track(self, name:str, future:Future) -> Future:
+        """
+        Records a step that runs in the background, from now until `future` is done.
+        """
+        started = self.now()
+        future.add_done_callback(lambda _: self.record(name, started, self.now()))
+        return future
+
+
+    def report(self) -> str:
+        """
+        Gets the steps recorded so far, in the order they started.
+        """
+        with self.__lock:
+            steps = sorted(self.steps, key=lambda step: step[1])
+
+        lines = []
+        for name, started, finished in steps:
+            if finished is None:
+                lines.append(f"{started:8.1f} ms {'':11}  {name}")
+            else:
+                lines.append(f"{started:8.1f} ms {finished:8.1f} ms  {name} ({finished - started:.1f} ms)")
+
+        return "\n".join(lines)
+
+
+
+class Startup:
+    """
+    Starts the app.
+
+    The database is connected to once and is only built or migrated if its
+    schema version is out of date. The reads the first screen needs are then
+    started in parallel on pooled connections, along with the maintenance of
+    the partitions, so that they run while the window is being shown.
+    Every step is measured in `timeline`.
+    """
+
+    def __init__(self, database:Database, pool_size:int=3):
+        self.database = database
+        self.dba = database.db_actions
+        self.pool = ConnectionPool(database, pool_size)
+        self.timeline = StartupTimeline()
+
+
+    def connect(self) -> bool:
+        """
+        Connects to the database and brings its schema up to date if it is not.
+
+        Returns
+        -------
+        bool
+            Whether the database could be connected to and is at the latest
+            schema version.
+        """
+        with self.timeline.step("Connect"):
+            if not self.database.connect():
+                return False
+
+        with self.timeline.step("Check schema version"):
+            schema_current = self.database.is_schema_current()
+
+        if not schema_current:
+            with self.timeline.step("Build database"):
+                if not self.database.build_database():
+                    print("Could not bring the database up to date.")
+                    return False
+
+        return True
+
+
+    def warm_up(self, reads:list[tuple[str, dict[str, Any]]]) -> None:
+        """
+        Starts the reads in parallel on the pooled connections, so that the
+        first calls of the same actions get their results without waiting for
+        them to run.
+        Also keeps the monthly partitions of history and purchases up to date
+        in the background.
+
+        Parameters
+        ----------
+        `reads` : list[tuple[str, dict[str, Any]]]
+            The name and keyword arguments of each read action.
+        """
+        for action, kargs in reads:
+            future = self.dba.prefetch(self.pool, action, **kargs)
+
+            # Otherwise the action failed to start and will just run when it is called
+            if isinstance(future, Future):
+                self.timeline.track(action, future)
+
+        def maintain(database:Database):
+            database.maintain_partitions()
+            database.apply_retention()
+
+        self.timeline.track("Maintain partitions", self.pool.submit(maintain))
+
+
+    def loaded(self) -> None:
+        """
+        Records that the first screen has been loaded and prints the timeline.
+        Any read that was started for it but not used is dropped.
+        """
+        self.dba._clear_prefetched()
+        self.timeline.record("First screen loaded", self.timeline.now())
+        print(f"Startup timeline:\n{self.timeline.report()}")
+
+
+    def close(self) -> None:
+        """
+        Closes the pooled connections once their work is done.
+        """
+        self.pool.close()
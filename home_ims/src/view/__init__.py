@@ -1,7 +1,8 @@
 from re import purge
-from PyQt6 import uic
 from mysql.connector.types import RowType
 
+from PyQt6.QtCore import QTimer
+
 from view import util
 from view.inventory import InventoryView
 from view.recipes import RecipesView
@@ -20,8 +21,16 @@ from action_result import ActionResult
 from Database import Database
 DB_Actions = Database.DB_Actions
 
-def show_window(dba:DB_Actions):
-    window = uic.loadUi(util.get_ui_path("main.ui"))
+# The actions and keyword arguments of the reads the first screen makes, so
+# that they can be started before the window is shown
+INITIAL_READS = [
+    ("select_users", {}),
+    ("select_storage", {}),
+    ("view_inventory_items", {"limit": util.PAGE_SIZE}),
+]
+
+def show_window(dba:DB_Actions, on_loaded=None, pool=None):
+    window = util.load_ui("main.ui")
 
     def refresh_users():
         current_user = window.userSelector.currentText()
@@ -44,21 +53,33 @@ def show_window(dba:DB_Actions):
 
         window.userSelector.blockSignals(False)
 
-    refresh_users()
-
-    inventory_tab = InventoryView(window, dba)
-    recipes_tab = RecipesView(window, dba)
-    meals_tab = MealsView(window, dba)
-    history_tab = HistoryView(window, dba)
-    purchases_tab = PurchasesView(window, dba)
-    analytics_tab = AnalyticsView(window, dba)
+    # The views of the tabs, constructed when their tab is first shown
+    tab_views = {
+        "inventoryTab": lambda: InventoryView(window, dba, pool),
+        "recipesTab": lambda: RecipesView(window, dba, pool),
+        "mealsTab": lambda: MealsView(window, dba),
+        "historyTab": lambda: HistoryView(window, dba, pool),
+        "purchasesTab": lambda: PurchasesView(window, dba, pool),
+        "analyticsTab": lambda: AnalyticsView(window, dba),
+    }
+    built_tabs = {}
+
+    # The data version of the database each tab was last loaded at.
+    # A tab is only reloaded when shown again if the data has changed since.
+    loaded_versions = {}
+
+    def configure_tab(tab_view):
+        if hasattr(tab_view, "configure_user"):
+            tab_view.configure_user(
+                window.userSelector.currentText(),
+                window.userSelector.currentData()
+            )
 
     def on_user_change(i):
         enabled = i != 0
         window.tabs.setEnabled(enabled)
         window.shoppingListBtn.setEnabled(enabled)
 
-        user = window.userSelector.itemText(i)
         privileged = window.userSelector.itemData(i)
 
         window.addItemTypeBtn.setEnabled(privileged)
@@ -66,43 +87,32 @@ def show_window(dba:DB_Actions):
         window.addLocationBtn.setEnabled(privileged)
         window.addUserBtn.setEnabled(privileged)
 
-        inventory_tab.configure_user(user, privileged)
-        recipes_tab.configure_user(user, privileged)
-        meals_tab.configure_user(user, privileged)
+        for tab_view in built_tabs.values():
+            configure_tab(tab_view)
 
     window.userSelector.currentIndexChanged.connect(on_user_change)
 
     def on_tab_change(i):
         tab = window.tabs.widget(i).objectName()
-        match tab:
-            case "recipesTab":
-                recipes_tab.rebuild_ui()
-                recipes_tab.configure_user(
-                    window.userSelector.currentText(),
-                    window.userSelector.currentData()
-                )
-            case "mealsTab":
-                meals_tab.rebuild_ui()
-                meals_tab.configure_user(
-                    window.userSelector.currentText(),
-                    window.userSelector.currentData()
-                )
-            case "historyTab":
-                history_tab.rebuild_ui()
-            case "purchasesTab":
-                purchases_tab.rebuild_ui()
-            case "analyticsTab":
-                analytics_tab.rebuild_ui()
-            case _:
-                inventory_tab.rebuild_ui()
-                inventory_tab.configure_user(
-                    window.userSelector.currentText(),
-                    window.userSelector.currentData()
-                )
+        if tab not in tab_views:
+            tab = "inventoryTab"
+
+        if tab not in built_tabs:
+            built_tabs[tab] = tab_views[tab]()
+            configure_tab(built_tabs[tab])
+
+        if loaded_versions.get(tab) != dba.data_version:
+            loaded_versions[tab] = dba.data_version
+            built_tabs[tab].rebuild_ui()
+
+    def load():
+        refresh_users()
+        on_user_change(window.userSelector.currentIndex())
+        on_tab_change(window.tabs.currentIndex())
+        if on_loaded is not None:
+            on_loaded()
 
     window.tabs.setCurrentIndex(0)
-    on_tab_change(0)
-    on_user_change(0)
 
     window.tabs.currentChanged.connect(on_tab_change)
     window.shoppingListBtn.clicked.connect(lambda: shopping_list.show(window, dba))
@@ -112,3 +122,6 @@ def show_window(dba:DB_Actions):
     window.addUserBtn.clicked.connect(lambda: add_user.show(window, dba, refresh_users))
 
     window.show()
+
+    # Load the data once the window is showing
+    QTimer.singleShot(0, load)
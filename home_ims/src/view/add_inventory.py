@@ -1,10 +1,9 @@
-from PyQt6 import uic
 from PyQt6.QtCore import Qt
 
 from view import util
 from action_result import ActionResult
 
-form_tpl, base_tpl = uic.loadUiType(util.get_ui_path("popup", "add_item.ui"))
+form_tpl, base_tpl = util.lazy_ui_type("popup", "add_item.ui")
 
 def show(window, dba, refresh):
     item_types = dba.select_item_type()
@@ -1,10 +1,9 @@
-from PyQt6 import uic
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtCore import Qt
 
 from view import util
 
-form_tpl, base_tpl = uic.loadUiType(util.get_ui_path("popup", "add_item_type.ui"))
+form_tpl, base_tpl = util.lazy_ui_type("popup", "add_item_type.ui")
 
 def show(window, dba):
     def gen_widget(close_dlg):
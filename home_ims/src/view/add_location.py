@@ -1,11 +1,10 @@
-from PyQt6 import uic
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtCore import Qt
 
 from action_result import ActionResult
 from view import util
 
-form_tpl, base_tpl = uic.loadUiType(util.get_ui_path("popup", "add_location.ui"))
+form_tpl, base_tpl = util.lazy_ui_type("popup", "add_location.ui")
 
 def show(window, dba):
     def gen_widget(close_dlg):
@@ -1,11 +1,10 @@
-from PyQt6 import uic
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtCore import Qt
 
 from view import util
 
-form_tpl, base_tpl = uic.loadUiType(util.get_ui_path("popup", "add_recipe.ui"))
-entry_form_tpl, entry_base_tpl = uic.loadUiType(util.get_ui_path("popup", "recipe_ingredient.ui"))
+form_tpl, base_tpl = util.lazy_ui_type("popup", "add_recipe.ui")
+entry_form_tpl, entry_base_tpl = util.lazy_ui_type("popup", "recipe_ingredient.ui")
 
 def show(window, dba, refresh):
     food_types = dba.dynamic_query("Food", "Select food type")
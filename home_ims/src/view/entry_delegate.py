@@ -0,0 +1,172 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionButton, QApplication
+from PyQt6.QtCore import Qt, QEvent, QRect, QSize, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QColor, QPalette, QPainter
+
+# Roles the models of entry lists provide their rows under
+ENTRY_ROLE = Qt.ItemDataRole.UserRole            # The row itself
+TEXTS_ROLE = Qt.ItemDataRole.UserRole + 1        # The texts to show, one per column
+DISABLED_BUTTONS_ROLE = Qt.ItemDataRole.UserRole + 2 # The names of the buttons that are disabled
+
+ENTRY_HEIGHT = 40
+ENTRY_MARGIN = 4
+ENTRY_SPACING = 6
+
+class EntryDelegate(QStyledItemDelegate):
+    """
+    Paints every row of a list view as an entry with its texts followed by a
+    row of buttons, instead of creating widgets for every row.
+
+    Only the rows that are visible are ever painted, so a list of any length
+    costs the same to show. Clicks on the painted buttons call
+    `on_click(button_name, entry)`.
+    """
+
+    def __init__(self, parent, buttons, on_click):
+        """
+        `buttons` is a list of `(name, text, colour)` from left to right, where
+        `colour` is the background colour of the button or `None` for the default.
+        """
+        super().__init__(parent)
+        self.buttons = buttons
+        self.on_click = on_click
+        self.pressed = None
+
+    def sizeHint(self, option, index):
+        # The list view stretches the entries to its width
+        return QSize(0, ENTRY_HEIGHT + ENTRY_MARGIN)
+
+    def entry_rect(self, option):
+        return option.rect.adjusted(ENTRY_MARGIN, ENTRY_MARGIN // 2, -ENTRY_MARGIN, -ENTRY_MARGIN // 2)
+
+    def button_rects(self, option):
+        rect = self.entry_rect(option)
+        metrics = option.fontMetrics
+        height = rect.height() - 2 * ENTRY_SPACING
+
+        rects = []
+        right = rect.right() - ENTRY_SPACING
+        for name, text, colour in reversed(self.buttons):
+            width = max(metrics.horizontalAdvance(text) + 2 * ENTRY_SPACING + 8, height)
+            rects.append((name, text, colour, QRect(right - width, rect.top() + ENTRY_SPACING, width, height)))
+            right -= width + ENTRY_SPACING
+
+        rects.reverse()
+        return rects
+
+    def button_at(self, option, pos):
+        for name, _, _, rect in self.button_rects(option):
+            if rect.contains(pos):
+                return name
+        return None
+
+    def paint(self, painter, option, index):
+        rect = self.entry_rect(option)
+        texts = index.data(TEXTS_ROLE) or []
+        disabled = index.data(DISABLED_BUTTONS_ROLE) or ()
+        buttons = self.button_rects(option)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(option.palette.color(QPalette.ColorRole.WindowText))
+        painter.setBrush(QColor("#ffffff"))
+        painter.drawRoundedRect(rect, 8, 8)
+
+        # Share the space left of the buttons evenly between the texts
+        text_right = (buttons[0][3].left() if buttons else rect.right()) - ENTRY_SPACING
+        text_left = rect.left() + ENTRY_SPACING
+        if texts:
+            width = (text_right - text_left - ENTRY_SPACING * (len(texts) - 1)) // len(texts)
+            for i, text in enumerate(texts):
+                text_rect = QRect(text_left + i * (width + ENTRY_SPACING), rect.top(), width, rect.height())
+                elided = option.fontMetrics.elidedText(text, Qt.TextElideMode.ElideRight, width)
+                painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, elided)
+
+        # The style and palette of the application rather than of the view, whose
+        # style sheet would otherwise apply to the buttons
+        style = QApplication.style()
+        for name, text, colour, button_rect in buttons:
+            button = QStyleOptionButton()
+            button.rect = button_rect
+            button.text = text
+            button.palette = QApplication.palette()
+            if colour is not None:
+                button.palette.setColor(QPalette.ColorRole.Button, QColor(colour))
+
+            if name in disabled:
+                button.state = QStyle.StateFlag.State_None
+                button.palette.setCurrentColorGroup(QPalette.ColorGroup.Disabled)
+            elif self.pressed == (index.row(), name):
+                button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Sunken
+            else:
+                button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        name = self.button_at(option, event.position().toPoint())
+        if name is None or name in (index.data(DISABLED_BUTTONS_ROLE) or ()):
+            self.pressed = None
+            return False
+
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.pressed = (index.row(), name)
+        else:
+            clicked = self.pressed == (index.row(), name)
+            self.pressed = None
+            if clicked:
+                self.on_click(name, index.data(ENTRY_ROLE))
+
+        if option.widget is not None:
+            option.widget.viewport().update(option.rect)
+        return True
+
+class EntryListModel(QAbstractListModel):
+    """
+    A list model of entries to be painted by an `EntryDelegate`.
+
+    Subclasses override `texts()` and set `PRIVILEGED_BUTTONS` to the buttons
+    only privileged users can use. Whether the user is privileged is held by
+    the model, so switching users is a single signal however many entries there are.
+    """
+    PRIVILEGED_BUTTONS = ()
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.privileged = True
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = records
+        self.endResetModel()
+
+    def set_privileged(self, privileged):
+        self.privileged = privileged
+        if self.records:
+            self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1), [DISABLED_BUTTONS_ROLE])
+
+    def texts(self, entry):
+        # The texts to show for an entry, one per column
+        return []
+
+    def data(self, index, role):
+        entry = self.records[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            texts = self.texts(entry)
+            return texts[0] if texts else None
+        elif role == ENTRY_ROLE:
+            return entry
+        elif role == TEXTS_ROLE:
+            return self.texts(entry)
+        elif role == DISABLED_BUTTONS_ROLE:
+            return () if self.privileged else self.PRIVILEGED_BUTTONS
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
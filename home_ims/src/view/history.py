@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QHeaderView
-from PyQt6.QtCore import Qt, QAbstractTableModel
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QBrush, QColor
 
 from view import util
@@ -16,30 +16,25 @@ NO_USER_BRUSH = QBrush(Qt.BrushStyle.BDiagPattern)
 NO_USER_BRUSH.setColor(Qt.GlobalColor.black)
 
 class HistoryView:
-    def __init__(self, window, dba:DB_Actions):
+    def __init__(self, window, dba:DB_Actions, pool=None):
         self.window = window
         self.dba:DB_Actions = dba
+        self.pool = pool
     
     def rebuild_ui(self):
-        records = self.dba.dynamic_query("History", "Select history records")
-        if not records.is_success():
-            util.open_error_dialog(self.window)
-            return
-
-        proxy = util.Sorting(self.window.analyticsView)
-        proxy.setSourceModel(Model(records.get_data_list()))
-
-        self.window.historyView.setModel(proxy)
+        # Sorting is done by the database, which loads the first page
+        self.window.historyView.setModel(Model(self.window, self.dba, "select_history_records", "timestamp", pool=self.pool))
         self.window.historyView.sortByColumn(2, Qt.SortOrder.DescendingOrder)
         self.window.historyView.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
 
-class Model(QAbstractTableModel):
-    def __init__(self, records):
-        super().__init__()
-        self.records = records
+class Model(util.PagedTableModel):
+    SORT_KEYS = ["item_name", "quantity", "timestamp", "wasted", "user_name"]
 
     def data(self, index, role):
-        entry = self.records[index.row()]
+        entry = self.record(index.row())
+        if entry is None:
+            return None
+
         match index.column(), role:
             case 0, Qt.ItemDataRole.DisplayRole | Qt.ItemDataRole.UserRole:
                 return entry["item_name"]
@@ -66,12 +61,6 @@ class Model(QAbstractTableModel):
                     return NO_USER_BRUSH
                 
 
-    def rowCount(self, index):
-        return len(self.records)
-
-    def columnCount(self, index):
-        return 5
-    
     def headerData(self, section, orientation, role):
         if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
             match section:
@@ -1,25 +1,29 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from PyQt6.QtCore import Qt, QDateTime
-from PyQt6 import uic
+import datetime as dt
+from PyQt6.QtCore import Qt, QDateTime, QModelIndex
 
 import view.add_inventory as add_inventory
 from view import util
+from view.entry_delegate import EntryDelegate, EntryListModel
 from Database import Database
 DB_Actions = Database.DB_Actions
 
-entry_form_tpl, entry_base_tpl = uic.loadUiType(util.get_ui_path("inv_entry.ui"))
-info_form_tpl, info_base_tpl = uic.loadUiType(util.get_ui_path("popup", "item_info.ui"))
-consume_form_tpl, consume_base_tpl = uic.loadUiType(util.get_ui_path("popup", "consume_item.ui"))
-waste_form_tpl, waste_base_tpl = uic.loadUiType(util.get_ui_path("popup", "waste_item.ui"))
-remove_form_tpl, remove_base_tpl = uic.loadUiType(util.get_ui_path("popup", "delete_item.ui"))
+info_form_tpl, info_base_tpl = util.lazy_ui_type("popup", "item_info.ui")
+consume_form_tpl, consume_base_tpl = util.lazy_ui_type("popup", "consume_item.ui")
+waste_form_tpl, waste_base_tpl = util.lazy_ui_type("popup", "waste_item.ui")
+remove_form_tpl, remove_base_tpl = util.lazy_ui_type("popup", "delete_item.ui")
 
 class InventoryView:
-    def __init__(self, window, dba:DB_Actions):
+    def __init__(self, window, dba:DB_Actions, pool=None):
         self.window = window
         self.dba:DB_Actions = dba
 
+        # Search as the search text is typed or the storage to search changes
+        self.search = util.SearchAsYouType(self.window, self.dba, pool, self.search_key, fetch_inventory, self.show_inventory)
+        self.window.inventorySearch.textChanged.connect(self.search.schedule)
+        self.window.storageSelector.currentIndexChanged.connect(self.search.schedule)
+
         self.window.addItemBtn.clicked.connect(
-            lambda: add_inventory.show(self.window, self.dba, self.update_view)
+            lambda: add_inventory.show(self.window, self.dba, self.model.refresh)
         )
         self.window.refreshInventoryBtn.clicked.connect(self.update_view)
         self.window.filterExpiry.checkStateChanged.connect(
@@ -29,6 +33,21 @@ class InventoryView:
         self.window.filterExpiry.setCheckState(Qt.CheckState.Unchecked)
         self.window.expiryInput.setVisible(False)
 
+        # The entries are painted by a delegate instead of each having their own widgets
+        self.model = Model(self.window)
+        self.delegate = EntryDelegate(
+            self.window.inventoryView,
+            [
+                ("info", "i", None),
+                ("consume", "Consume", None),
+                ("throwOut", "Throw out", None),
+                ("remove", "X", "#ff6464")
+            ],
+            self.on_entry_clicked
+        )
+        self.window.inventoryView.setModel(self.model)
+        self.window.inventoryView.setItemDelegate(self.delegate)
+
     def rebuild_ui(self):
         self.window.inventorySearch.clear()
         self.window.storageSelector.clear()
@@ -49,53 +68,35 @@ class InventoryView:
         self.update_view()
 
     def update_view(self):
+        self.search.run()
+
+    def search_key(self):
         expiry_threshold = None
         if self.window.filterExpiry.checkState() == Qt.CheckState.Checked:
             expiry_threshold = self.window.expiryInput.dateTime().toPyDateTime()
 
-        inv = self.dba.view_inventory_items(
-            self.window.inventorySearch.text(),
-            self.window.storageSelector.currentData(),
-            expiry_threshold
-        )
-
-        if not inv.is_success():
-            util.open_error_dialog(self.window)
-            return
-
-        c_layout = QVBoxLayout()
-        container = QWidget()
-        container.setProperty("nobackground", True)
-        container.setLayout(c_layout)
-
-        for entry in inv.get_data_list():
-            widget = entry_base_tpl()
-            form = entry_form_tpl()
-            form.setupUi(widget)
-
-            form.itemType.setText(entry["item_name"])
-            form.quantity.setText(util.format_quantity(entry["quantity"], entry["unit"]))
-            form.infoBtn.clicked.connect(lambda _, e=entry: self.item_info_dialog(e))
-            form.consumeBtn.clicked.connect(lambda _, e=entry: self.consume_item_dialog(e))
-            form.throwOutBtn.clicked.connect(lambda _, e=entry: self.throw_out_item_dialog(e))
-            form.removeBtn.clicked.connect(lambda _, e=entry: self.remove_item_dialog(e))
-
-            if entry["expiry"] is None:
-                #form.expiry.hide()
-                form.expiry.setText("                   ")
-            else:
-                form.expiry.setText("Expires " + util.format_date(entry["expiry"]))
-
-            c_layout.addWidget(widget)
-
-        c_layout.addStretch()
-
-        self.window.inventoryView.setWidget(container)
+        search = self.window.inventorySearch.text()
+        storage = self.window.storageSelector.currentData()
+        return (search, storage, expiry_threshold)
+
+    def show_inventory(self, key, inv):
+        # Further pages are loaded on the main connection as the list is scrolled
+        self.model.load(lambda **page: self.dba.view_inventory_items(*key, **page), inv)
+
+    def on_entry_clicked(self, button, entry):
+        match button:
+            case "info":
+                self.item_info_dialog(entry)
+            case "consume":
+                self.consume_item_dialog(entry)
+            case "throwOut":
+                self.throw_out_item_dialog(entry)
+            case "remove":
+                self.remove_item_dialog(entry)
 
     def configure_user(self, user, privileged):
         self.window.addItemBtn.setEnabled(privileged)
-        for widget in self.window.inventoryView.widget().findChildren(QWidget, "removeBtn"):
-            widget.setEnabled(privileged)
+        self.model.set_privileged(privileged)
 
     def item_info_dialog(self, entry):
         def gen_dialog(close_dlg):
@@ -153,7 +154,7 @@ class InventoryView:
                     util.open_error_dialog(self.window)
                     return
 
-                self.update_view() # TODO Update only this entry.
+                self.model.take(entry, quantity)
                 close_dlg()
 
             form.item.setText(entry["item_name"])
@@ -191,7 +192,7 @@ class InventoryView:
                     util.open_error_dialog(self.window)
                     return
 
-                self.update_view() # TODO Update only this entry.
+                self.model.take(entry, quantity)
                 close_dlg()
 
             form.item.setText(entry["item_name"])
@@ -221,7 +222,7 @@ class InventoryView:
                     util.open_error_dialog(self.window)
                     return
 
-                self.update_view() # TODO Update only this entry.
+                self.model.take(entry, entry["quantity"])
                 close_dlg()
 
             form.item.setText(entry["item_name"])
@@ -231,3 +232,145 @@ class InventoryView:
             return widget
         
         util.open_dialog(self.window, gen_dialog)
+
+def fetch_inventory(dba:DB_Actions, search, storage, expiry_threshold):
+    return dba.view_inventory_items(search, storage, expiry_threshold, limit=util.PAGE_SIZE)
+
+class Model(EntryListModel):
+    PRIVILEGED_BUTTONS = ("remove",)
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.select = None
+        self.next_cursor = None
+        self.newest = None
+
+    def load(self, select, inv):
+        """
+        Shows the first page of the entries, `inv`, which was selected by
+        `select(limit=util.PAGE_SIZE)`.
+        """
+        self.beginResetModel()
+        self.select = select
+        self.records = []
+        self.newest = None
+        self.add_page(inv)
+        self.endResetModel()
+
+    def add_page(self, inv):
+        rows = inv.get_data_list()
+        self.records.extend(rows)
+        self.next_cursor = inv.get_next_cursor()
+        self.track_newest(rows)
+
+    def track_newest(self, rows):
+        for entry in rows:
+            if self.newest is None or entry["timestamp"] > self.newest:
+                self.newest = entry["timestamp"]
+
+    def find(self, entry):
+        key = entry_key(entry)
+        for row, e in enumerate(self.records):
+            if entry_key(e) == key:
+                return row
+        return None
+
+    def take(self, entry, quantity):
+        """
+        Updates an entry after `quantity` of it was removed from the inventory,
+        removing the entry once none of it is left.
+        """
+        row = self.find(entry)
+        if row is None:
+            # The entry is no longer shown as it was, so ask the database instead
+            self.refresh()
+            return
+
+        remaining = self.records[row]["quantity"] - quantity
+        if remaining <= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.records[row]
+            self.endRemoveRows()
+        else:
+            self.records[row] = {**self.records[row], "quantity": remaining}
+            self.dataChanged.emit(self.index(row), self.index(row))
+
+    def refresh(self):
+        """
+        Selects only the entries added since the newest one shown and merges
+        them into the list where they belong.
+        If no entry is shown, or more than a page of them were added, the
+        first page is loaded again instead.
+        """
+        if self.select is None:
+            return
+
+        if self.newest is not None:
+            inv = self.select(added_since=self.newest, limit=util.PAGE_SIZE)
+            if not inv.is_success():
+                util.open_error_dialog(self.window)
+                return
+
+        if self.newest is None or inv.get_next_cursor() is not None:
+            inv = self.select(limit=util.PAGE_SIZE)
+            if not inv.is_success():
+                util.open_error_dialog(self.window)
+                return
+
+            self.load(self.select, inv)
+            return
+
+        for entry in inv.get_data_list():
+            row = self.find(entry)
+            if row is not None:
+                self.records[row] = entry
+                self.dataChanged.emit(self.index(row), self.index(row))
+                continue
+
+            # Find where the entry belongs among the loaded entries
+            key = sort_key(entry)
+            row = next((i for i, e in enumerate(self.records) if sort_key(e) > key), None)
+            if row is None:
+                if self.next_cursor is not None:
+                    # It belongs to a page that has not been loaded yet
+                    continue
+                row = len(self.records)
+
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.records.insert(row, entry)
+            self.endInsertRows()
+
+        self.track_newest(inv.get_data_list())
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.next_cursor is not None
+
+    def fetchMore(self, parent):
+        inv = self.select(after=self.next_cursor, limit=util.PAGE_SIZE)
+        if not inv.is_success():
+            self.next_cursor = None
+            util.open_error_dialog(self.window)
+            return
+
+        rows = inv.get_data_list()
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.records), len(self.records) + len(rows) - 1)
+        self.add_page(inv)
+        if rows:
+            self.endInsertRows()
+
+    def texts(self, entry):
+        return [
+            entry["item_name"],
+            util.format_quantity(entry["quantity"], entry["unit"]),
+            "" if entry["expiry"] is None else "Expires " + util.format_date(entry["expiry"])
+        ]
+
+def entry_key(entry):
+    return (entry["item_name"], entry["storage_name"], entry["timestamp"])
+
+def sort_key(entry):
+    # The order of DB_Actions.INVENTORY_KEYSET, with names compared regardless of case as the database does
+    expiry = entry["expiry"]
+    return (expiry is None, expiry or dt.datetime.min, entry["item_name"].casefold(), entry["storage_name"].casefold(), entry["timestamp"])
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QHeaderView
-from PyQt6.QtCore import Qt, QAbstractTableModel
+from PyQt6.QtCore import Qt
 from datetime import datetime
 
 from view import util
@@ -7,30 +7,25 @@ from Database import Database
 DB_Actions = Database.DB_Actions
 
 class PurchasesView:
-    def __init__(self, window, dba:DB_Actions):
+    def __init__(self, window, dba:DB_Actions, pool=None):
         self.window = window
         self.dba:DB_Actions = dba
+        self.pool = pool
 
     def rebuild_ui(self):
-        records = self.dba.dynamic_query("Purchase", "Select purchases")
-        if not records.is_success():
-            util.open_error_dialog(self.window)
-            return
-
-        proxy = util.Sorting(self.window.analyticsView)
-        proxy.setSourceModel(Model(records.get_data_list()))
-
-        self.window.purchasesView.setModel(proxy)
+        # Sorting is done by the database, which loads the first page
+        self.window.purchasesView.setModel(Model(self.window, self.dba, "select_purchases", "timestamp", pool=self.pool))
         self.window.purchasesView.sortByColumn(2, Qt.SortOrder.DescendingOrder)
         self.window.purchasesView.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
 
-class Model(QAbstractTableModel):
-    def __init__(self, records):
-        super().__init__()
-        self.records = records
+class Model(util.PagedTableModel):
+    SORT_KEYS = ["item_name", "quantity", "timestamp", "price", "store", "parent_name"]
 
     def data(self, index, role):
-        entry = self.records[index.row()]
+        entry = self.record(index.row())
+        if entry is None:
+            return None
+
         match index.column(), role:
             case 0, Qt.ItemDataRole.DisplayRole | Qt.ItemDataRole.UserRole:
                 return entry["item_name"]
@@ -57,12 +52,6 @@ class Model(QAbstractTableModel):
             case 5, Qt.ItemDataRole.DisplayRole | Qt.ItemDataRole.UserRole:
                 return entry["parent_name"]
 
-    def rowCount(self, index):
-        return len(self.records)
-
-    def columnCount(self, index):
-        return 6
-    
     def headerData(self, section, orientation, role):
         if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
             match section:
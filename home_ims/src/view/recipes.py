@@ -1,72 +1,87 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QAbstractButton
-from PyQt6 import uic
-
 from action_result import ActionResult
 import view.add_recipe as add_recipe
 from view import util
+from view.entry_delegate import EntryDelegate, EntryListModel
 
-entry_form_tpl, entry_base_tpl = uic.loadUiType(util.get_ui_path("recipe_entry.ui"))
-schedule_form_tpl, schedule_base_tpl = uic.loadUiType(util.get_ui_path("popup", "schedule_meal.ui"))
-remove_form_tpl, remove_base_tpl = uic.loadUiType(util.get_ui_path("popup", "delete_recipe.ui"))
+schedule_form_tpl, schedule_base_tpl = util.lazy_ui_type("popup", "schedule_meal.ui")
+remove_form_tpl, remove_base_tpl = util.lazy_ui_type("popup", "delete_recipe.ui")
 
 class RecipesView:
-    def __init__(self, window, dba):
+    def __init__(self, window, dba, pool=None):
         self.window = window
         self.dba = dba
 
+        # The recipe feasibility and the data version it was checked at
+        self.feasibility = None
+
+        # Search as the search text is typed or the way to search changes
+        self.search = util.SearchAsYouType(self.window, self.dba, pool, self.search_key, self.fetch_recipes, self.show_recipes)
+        self.window.recipeSearch.textChanged.connect(self.search.schedule)
+        self.window.searchByName.toggled.connect(self.search.schedule)
+
         self.window.addRecipeBtn.clicked.connect(
             lambda: add_recipe.show(self.window, self.dba, self.update_view)
         )
         self.window.refreshRecipesBtn.clicked.connect(self.update_view)
+        self.window.canCookOnly.toggled.connect(self.update_view)
+
+        self.model = Model()
+        self.delegate = EntryDelegate(
+            self.window.recipesView,
+            [("schedule", "Schedule", None), ("remove", "X", "#ff6464")],
+            self.on_entry_clicked
+        )
+        self.window.recipesView.setModel(self.model)
+        self.window.recipesView.setItemDelegate(self.delegate)
 
     def rebuild_ui(self):
         self.window.recipeSearch.clear()
         self.window.searchByName.setChecked(True)
+        self.window.canCookOnly.setChecked(False)
         self.update_view()
 
     def update_view(self):
-        # TODO To Database.py
-        search = self.window.recipeSearch.text()
-
-        recipes:ActionResult
-        if self.window.searchByName.isChecked():
-            search = search.replace("!", "!!").replace("%", "!%")
-            recipes = self.dba.dynamic_query(
-                "Recipe",
-                "View recipes",
-                recipe_name=f"%{search}%"
-            )
-        else:
-            recipes = self.dba.search_recipes_by_ingredient(search)
-
-        if not recipes.is_success():
-            util.open_error_dialog(self.window)
-            return
-
-        c_layout = QVBoxLayout()
-        container = QWidget()
-        container.setProperty("nobackground", True)
-        container.setLayout(c_layout)
+        self.search.run()
 
-        for entry in recipes.get_data_list():
-            widget = entry_base_tpl()
-            form = entry_form_tpl()
-            form.setupUi(widget)
-
-            form.recipeName.setText(entry["recipe_name"])
-            form.scheduleBtn.clicked.connect(lambda _, e=entry: self.schedule_dialog(e))
-            form.removeBtn.clicked.connect(lambda _, e=entry: self.remove_dialog(e))
-
-            c_layout.addWidget(widget)
-        
-        c_layout.addStretch()
+    def search_key(self):
+        return (
+            self.window.recipeSearch.text(),
+            self.window.searchByName.isChecked(),
+            self.window.canCookOnly.isChecked()
+        )
 
-        self.window.recipesView.setWidget(container)
+    def fetch_recipes(self, dba, search, by_name, can_cook_only):
+        return fetch_recipes(dba, search, by_name, can_cook_only, self.get_feasibility)
+
+    def get_feasibility(self, dba):
+        """
+        Checks every recipe against the stock on hand, only once for every
+        version of the data rather than on every search.
+        May be called from the pool's threads.
+        """
+        version = self.dba.data_version
+        cached = self.feasibility
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        feasibility = dba.select_recipe_feasibility()
+        if feasibility.is_success():
+            self.feasibility = (version, feasibility)
+        return feasibility
+
+    def show_recipes(self, key, entries):
+        self.model.set_records(entries.get_data_list())
+
+    def on_entry_clicked(self, button, entry):
+        match button:
+            case "schedule":
+                self.schedule_dialog(entry)
+            case "remove":
+                self.remove_dialog(entry)
 
     def configure_user(self, user, privileged):
         self.window.addRecipeBtn.setEnabled(privileged)
-        for widget in self.window.recipesView.widget().findChildren(QAbstractButton):
-            widget.setEnabled(privileged)
+        self.model.set_privileged(privileged)
 
     def schedule_dialog(self, entry):
         def gen_dialog(close_dlg):
@@ -124,3 +139,55 @@ class RecipesView:
             return widget
 
         util.open_dialog(self.window, gen_dialog)
+
+def fetch_recipes(dba, search, by_name, can_cook_only, get_feasibility=None):
+    # TODO To Database.py
+    recipes:ActionResult
+    if by_name:
+        names = dba.search_recipe_names(search)
+        recipes = ActionResult(
+            data=[{"recipe_name": n["name"]} for n in names.get_data_list()],
+            error_message=names.get_error_message()
+        )
+    else:
+        # Comma separated ingredients, "+" marks ones that are required and "-" ones to exclude
+        all_of, any_of, none_of = [], [], []
+        for term in search.split(","):
+            term = term.strip()
+            if term.startswith("+"):
+                all_of.append(term[1:])
+            elif term.startswith("-"):
+                none_of.append(term[1:])
+            elif term:
+                any_of.append(term)
+        recipes = dba.search_recipes(all_of=all_of, any_of=any_of, none_of=none_of)
+
+    if not recipes.is_success():
+        return recipes
+
+    # Check every recipe against the stock on hand at once
+    feasibility = dba.select_recipe_feasibility() if get_feasibility is None else get_feasibility(dba)
+    if not feasibility.is_success():
+        return feasibility
+    missing = {e["recipe_name"]: e["missing"] for e in feasibility.get_data_list()}
+
+    entries = []
+    for entry in recipes.get_data_list():
+        recipe_missing = missing.get(entry["recipe_name"], [])
+        if can_cook_only and recipe_missing:
+            continue
+        entries.append({"recipe_name": entry["recipe_name"], "missing": recipe_missing})
+
+    return ActionResult(data=entries)
+
+class Model(EntryListModel):
+    PRIVILEGED_BUTTONS = ("schedule", "remove")
+
+    def texts(self, entry):
+        if entry["missing"]:
+            missing = "Missing " + ", ".join(
+                f"{util.format_quantity(m['quantity'], m['unit'])} {m['food_name']}" for m in entry["missing"]
+            )
+        else:
+            missing = "Ready to cook"
+        return [entry["recipe_name"], missing]
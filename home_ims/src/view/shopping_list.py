@@ -1,10 +1,9 @@
-from PyQt6 import uic
 from PyQt6.QtWidgets import QWidget, QApplication
 from PyQt6.QtCore import Qt
 
 from view import util
 
-form_tpl, base_tpl = uic.loadUiType(util.get_ui_path("popup", "shopping_list.ui"))
+form_tpl, base_tpl = util.lazy_ui_type("popup", "shopping_list.ui")
 
 def show(window, dba):
     shopping_list = dba.gen_shopping_list()
@@ -1,12 +1,64 @@
+import bisect
 import os
+import importlib
+from collections import OrderedDict
+from functools import cache
 from PyQt6 import uic
-from PyQt6.QtCore import Qt, QSortFilterProxyModel, QDateTime
+from PyQt6.QtCore import Qt, QSortFilterProxyModel, QDateTime, QAbstractTableModel, QModelIndex, QObject, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QDateTimeEdit
 
+from action_result import ActionResult
+
 root = os.path.dirname(__file__)
+compiled_root = os.path.join(root, "ui_compiled")
+
+# Number of rows to load from the database at a time
+PAGE_SIZE = 200
+
+# Milliseconds to wait after the last key press before searching
+SEARCH_DELAY = 250
+
 def get_ui_path(*path):
     return os.path.join(root, "ui", *path)
 
+@cache
+def load_ui_type(*path):
+    """
+    Gets the form class and base class of a .ui file, as `uic.loadUiType()` does.
+
+    The module compiled from the .ui file by COMPILE_UI.py is imported if it is
+    up to date, and the .ui file is only parsed if it is not. Either way each
+    file is only loaded once, the first time it is needed.
+    """
+    ui_path = get_ui_path(*path)
+    module_path = os.path.join(compiled_root, *path).removesuffix(".ui") + ".py"
+
+    if os.path.exists(module_path) and os.path.getmtime(module_path) >= os.path.getmtime(ui_path):
+        module = importlib.import_module(".".join(["view", "ui_compiled", *path]).removesuffix(".ui"))
+        return module.FORM_CLASS, module.BASE_CLASS
+
+    return uic.loadUiType(ui_path)
+
+def lazy_ui_type(*path):
+    """
+    Gets stand-ins for the form class and base class of a .ui file that only
+    load it when they are first called, so popups cost nothing until they are opened.
+    """
+    return (
+        lambda *args: load_ui_type(*path)[0](*args),
+        lambda *args: load_ui_type(*path)[1](*args)
+    )
+
+def load_ui(*path):
+    """
+    Creates a widget from a .ui file with its child widgets as attributes, as `uic.loadUi()` does.
+    """
+    form_class, base_class = load_ui_type(*path)
+    widget_class = type(form_class.__name__.removeprefix("Ui_"), (base_class, form_class), {})
+    widget = widget_class()
+    widget.setupUi(widget)
+    return widget
+
 def format_quantity(quantity, unit):
     qf = f"{quantity:.1f}".removesuffix(".0")
     return f"{qf} {unit}" if unit else qf
@@ -28,7 +80,7 @@ def open_dialog(window, gen):
     dialog.resize(dialog.minimumSize())
     dialog.open()
 
-error_form_tpl, error_widget_tpl = uic.loadUiType(get_ui_path("popup", "error_generic.ui"))
+error_form_tpl, error_widget_tpl = lazy_ui_type("popup", "error_generic.ui")
 def open_error_dialog(window, msg=None):
     def gen_widget(close):
         widget = error_widget_tpl()
@@ -57,3 +109,304 @@ class Sorting(QSortFilterProxyModel):
             return False
         else:
             return lval < rval
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    A table model whose rows are sorted by the database and loaded a page
+    at a time as the view is scrolled.
+
+    Only the most recently used `MAX_CACHED_PAGES` pages are kept in memory.
+    The cursors every page starts and ends at are kept instead, so a page that
+    was dropped is loaded again with a single query when it is scrolled back to.
+    It is loaded in the background, on a pooled connection if there is one, and
+    its rows are shown once it has loaded. Rows added or removed within the page
+    since it was first loaded are inserted or removed along with it, so pages
+    can change length.
+
+    The rows are selected with the `action` of `dba`, which takes the sort key
+    and the cursors of the page. Subclasses set `SORT_KEYS` to the name the
+    database sorts each column by.
+    """
+    SORT_KEYS:list[str] = []
+    MAX_CACHED_PAGES = 10
+
+    # Emitted when a page that was dropped has loaded again, from the pool's threads
+    page_loaded = pyqtSignal(int, int, object)
+
+    def __init__(self, window, dba, action, sort_key, descending=True, pool=None):
+        super().__init__()
+        self.window = window
+        self.dba = dba
+        self.action = action
+        self.sort_key = sort_key
+        self.descending = descending
+        self.pool = pool
+        self.loaded = False
+        self.generation = 0
+        self.page_loaded.connect(self.on_page_loaded)
+        self.clear()
+
+    def clear(self):
+        # The cursor each page starts at, ending with the cursor of the next page to fetch
+        self.page_cursors = [None]
+        # The row each page starts at and the number of rows in it
+        self.page_starts = []
+        self.page_lengths = []
+        self.pages = OrderedDict()
+        self.pending = set()
+        self.row_count = 0
+        self.has_more = False
+
+    def page_arguments(self, page_number):
+        arguments = {
+            "sort_by": self.sort_key,
+            "descending": self.descending,
+            "after": self.page_cursors[page_number],
+        }
+        if page_number + 1 < len(self.page_cursors):
+            # A page that was loaded before, which ends where the next one starts
+            arguments["until"] = self.page_cursors[page_number + 1]
+        elif page_number == len(self.page_lengths):
+            arguments["limit"] = PAGE_SIZE
+        return arguments
+
+    def fetch_page(self, page_number):
+        return getattr(self.dba, self.action)(**self.page_arguments(page_number))
+
+    def cache_page(self, page_number, rows):
+        self.pages[page_number] = rows
+        self.pages.move_to_end(page_number)
+        while len(self.pages) > self.MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+
+    def append_page(self, page):
+        rows = page.get_data_list()
+        self.cache_page(len(self.page_lengths), rows)
+        self.page_starts.append(self.row_count)
+        self.page_lengths.append(len(rows))
+        self.row_count += len(rows)
+        self.has_more = page.has_next_page()
+        if self.has_more:
+            self.page_cursors.append(page.get_next_cursor())
+
+    def load(self):
+        self.beginResetModel()
+        self.clear()
+        self.loaded = True
+        # Pages still loading were for the rows before the reset
+        self.generation += 1
+
+        page = self.fetch_page(0)
+        if page.is_success():
+            self.append_page(page)
+        self.endResetModel()
+
+        if not page.is_success():
+            open_error_dialog(self.window)
+
+    def record(self, row):
+        page_number = bisect.bisect_right(self.page_starts, row) - 1
+        if page_number not in self.pages:
+            # The page was dropped from the cache, so show it once it has loaded again
+            self.reload_page(page_number)
+            return None
+
+        self.pages.move_to_end(page_number)
+        rows = self.pages[page_number]
+        offset = row - self.page_starts[page_number]
+        return rows[offset] if offset < len(rows) else None
+
+    def reload_page(self, page_number):
+        if page_number in self.pending:
+            return
+        self.pending.add(page_number)
+
+        generation = self.generation
+        arguments = self.page_arguments(page_number)
+        if self.pool is None:
+            # Not while the view is painting, which is when pages are found to be missing
+            QTimer.singleShot(0, lambda: self.on_page_loaded(
+                generation, page_number, getattr(self.dba, self.action)(**arguments)
+            ))
+            return
+
+        future = self.pool.submit(lambda database: getattr(database.db_actions, self.action)(**arguments))
+        future.add_done_callback(lambda f: self.page_loaded.emit(
+            generation, page_number, f.result() if f.exception() is None else ActionResult(exception=f.exception())
+        ))
+
+    def on_page_loaded(self, generation, page_number, page):
+        if generation != self.generation:
+            return
+        self.pending.discard(page_number)
+
+        if not page.is_success():
+            open_error_dialog(self.window)
+            return
+
+        rows = page.get_data_list()
+        start = self.page_starts[page_number]
+        old_length = self.page_lengths[page_number]
+        new_length = len(rows)
+        change = new_length - old_length
+
+        # Rows added or removed within the page since it was first loaded
+        if change > 0:
+            self.beginInsertRows(QModelIndex(), start + old_length, start + new_length - 1)
+        elif change < 0:
+            self.beginRemoveRows(QModelIndex(), start + new_length, start + old_length - 1)
+
+        self.cache_page(page_number, rows)
+        self.page_lengths[page_number] = new_length
+        for later in range(page_number + 1, len(self.page_starts)):
+            self.page_starts[later] += change
+        self.row_count += change
+
+        if change > 0:
+            self.endInsertRows()
+        elif change < 0:
+            self.endRemoveRows()
+
+        if min(old_length, new_length) > 0:
+            self.dataChanged.emit(
+                self.index(start, 0),
+                self.index(start + min(old_length, new_length) - 1, self.columnCount() - 1)
+            )
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        sort_key = self.SORT_KEYS[column]
+        descending = order == Qt.SortOrder.DescendingOrder
+        if self.loaded and (sort_key, descending) == (self.sort_key, self.descending):
+            return
+
+        self.sort_key = sort_key
+        self.descending = descending
+        self.load()
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.has_more
+
+    def fetchMore(self, parent):
+        page = self.fetch_page(len(self.page_lengths))
+        if not page.is_success():
+            self.has_more = False
+            open_error_dialog(self.window)
+            return
+
+        first = self.row_count
+        count = len(page.get_data_list())
+        if count:
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self.append_page(page)
+        if count:
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.SORT_KEYS)
+
+class SearchAsYouType(QObject):
+    """
+    Runs a search once its text has stopped changing for `SEARCH_DELAY`
+    milliseconds, on a pooled connection so that typing is never held up.
+
+    Only the results of the latest search are shown. A search that is
+    superseded while it runs still finishes, but its results are not shown.
+    Results are cached by the `key()` they were searched with, so going back
+    to a shorter prefix of the text shows its results at once, for as long as
+    the data has not changed.
+
+    `key()` gets the text and any other filters from the widgets as a tuple.
+    `fetch(dba, *key)` runs the search, in the background if there is a pool,
+    and `show(key, result)` shows its `ActionResult`.
+    """
+    MAX_CACHED_SEARCHES = 50
+
+    finished = pyqtSignal(int, object, object)
+
+    def __init__(self, window, dba, pool, key, fetch, show):
+        super().__init__(window)
+        self.window = window
+        self.dba = dba
+        self.pool = pool
+        self.key = key
+        self.fetch = fetch
+        self.show = show
+
+        self.generation = 0
+        self.cache = OrderedDict()
+        self.cache_version = dba.data_version
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(SEARCH_DELAY)
+        self.timer.timeout.connect(self.start)
+
+        # Emitted from the pool's threads, so the results are shown on the UI thread
+        self.finished.connect(self.on_finished)
+
+    def schedule(self):
+        """
+        Searches once the text stops changing.
+        """
+        self.timer.start()
+
+    def cancel(self):
+        """
+        Cancels the scheduled search and discards the results of any running one.
+        """
+        self.timer.stop()
+        self.generation += 1
+
+    def run(self):
+        """
+        Searches right away on the main connection, ignoring the cache.
+        """
+        self.cancel()
+        self.check_cache()
+        key = self.key()
+        self.on_finished(self.generation, key, self.fetch(self.dba, *key))
+
+    def check_cache(self):
+        # Cached results are only valid until the data changes
+        if self.cache_version != self.dba.data_version:
+            self.cache.clear()
+            self.cache_version = self.dba.data_version
+
+    def start(self):
+        self.cancel()
+        self.check_cache()
+        key = self.key()
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.show(key, self.cache[key])
+            return
+
+        if self.pool is None:
+            self.on_finished(self.generation, key, self.fetch(self.dba, *key))
+            return
+
+        generation = self.generation
+        future = self.pool.submit(lambda database: self.fetch(database.db_actions, *key))
+        future.add_done_callback(lambda f: self.finished.emit(
+            generation, key, f.result() if f.exception() is None else ActionResult(exception=f.exception())
+        ))
+
+    def on_finished(self, generation, key, result):
+        # Superseded results are still cached for when their text is searched again
+        if result.is_success() and self.cache_version == self.dba.data_version:
+            self.cache[key] = result
+            while len(self.cache) > self.MAX_CACHED_SEARCHES:
+                self.cache.popitem(last=False)
+
+        if generation != self.generation:
+            return
+
+        if not result.is_success():
+            open_error_dialog(self.window)
+            return
+
+        self.show(key, result)
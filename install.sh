@@ -58,5 +58,8 @@ EOL
 
 echo "MARIADB_PASSWORD:str = \"${db_password}\"" > secrets.py
 
+printf "\033[34mCompiling UI forms...\033[0m\n"
+python3 ./COMPILE_UI.py || printf "Failed to compile UI forms, they will be loaded from the .ui files instead.\n"
+
 
 printf "\033[32mInstall successful\033[0m\n"